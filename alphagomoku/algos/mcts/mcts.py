@@ -15,21 +15,27 @@ The MCTS implementation in this file is heavily motivated by the MuZero paper, s
 https://arxiv.org/pdf/1911.08265.
 """
 
+import concurrent.futures as cf
+import math
 import os
+import queue
+import threading
 import time
-from copy import deepcopy
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 
-import matplotlib.pyplot as plt
 import numpy as np
-import seaborn as sns
 import torch
-from algos.mcts.mcts_utils import TreeNode, TreeStats
+from algos.mcts.mcts_utils import (
+    TreeNode,
+    TreeStats,
+    random_playout,
+    seed_playout_rng,
+    ucb_argmax,
+)
 from experiment_logging.base_logging_connector import (
     BaseLoggingConnector,
     NoopLoggingConnector,
 )
-from experiment_logging.wandb_connector import WandBConnector
 from game.gomoku_utils import GridPosition, Move, PlayerEnum
 from rl_env.env import GomokuEnv
 
@@ -51,9 +57,14 @@ class MCTSConfig:
     "Exploration fraction for the Dirichlet noise added to the root node."
     deterministic: bool = False
     "Deterministic flag."
-    # TODO: Fix parallelisation, see below. Use only one worker for now.
     max_workers: int = 1    #  field(default_factory=lambda: os.cpu_count() // 2)    # type: ignore
-    "Number of workers to use for parallel simulations."
+    "Number of worker processes for root parallelization. Run single-process if 1."
+    tree_parallelism: bool = False
+    "Whether workers should share a single tree (threads + virtual loss) instead of root parallelization."
+    virtual_loss: int = 3
+    "Virtual loss applied to a child while a worker is descending through it, reverted on backpropagation."
+    eval_batch_size: int = 16
+    "Maximum number of pending leaf evaluations batched into one policy-network forward pass."
     ## Muzero specific parameters
     use_muzero: bool = False
     """Whether to use the MuZero setup."""
@@ -61,8 +72,75 @@ class MCTSConfig:
     "Initial value for the log correction to the UCB formula. Default is from the MuZero paper."
     mu_ct: float = 1.25
     "Initial value for the UCB exploration constant. Default is from the MuZero paper."
-    # Metric logger
-    metric_logger: BaseLoggingConnector = WandBConnector()
+    # Metric logger; a fresh no-op connector per config, swap in e.g. WandBConnector to log runs
+    metric_logger: BaseLoggingConnector = field(default_factory=NoopLoggingConnector)
+
+
+class BatchedPolicyEvaluator:
+    """
+    Batch policy-network evaluations across concurrent rollouts.
+
+    Worker threads submit their leaf board and parent hidden state and block on a future. A
+    dedicated evaluator thread collects the pending requests, up to the batch size, stacks the
+    boards and runs a single batched forward pass, then distributes the results back through the
+    futures. This amortises the per-call overhead of the network across the whole batch instead of
+    running one forward pass per simulation.
+    """
+    def __init__(self, policy_network: torch.nn.Module, batch_size: int = 16, batch_window: float = 0.002):
+        self._network = policy_network
+        self._batch_size = batch_size
+        self._batch_window = batch_window
+        self._queue: queue.Queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def predict(self, board: np.ndarray, hidden_state: np.ndarray | None) -> tuple[np.ndarray, np.ndarray]:
+        """Queue a leaf evaluation and block until the batched forward pass delivers its result."""
+        future: cf.Future = cf.Future()
+        self._queue.put((board, hidden_state, future))
+        return future.result()
+
+    def close(self):
+        """Stop the evaluator thread and fail any requests it never got to."""
+        self._stop.set()
+        self._thread.join()
+        while True:
+            try:
+                _, _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(RuntimeError("BatchedPolicyEvaluator closed before the request was served"))
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.05)]
+            except queue.Empty:
+                continue
+            # wait briefly for more requests to fill the batch
+            deadline = time.monotonic() + self._batch_window
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                if hasattr(self._network, "predict_batch"):
+                    boards = np.stack([board for board, _, _ in batch])
+                    hidden_states = [hidden_state for _, hidden_state, _ in batch]
+                    results = self._network.predict_batch(boards, hidden_states)
+                else:
+                    results = [self._network.predict(board, hidden_state) for board, hidden_state, _ in batch]
+            except Exception as exc:    # a broken network must fail the blocked workers, not hang them
+                for _, _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
 
 
 class MCTS:
@@ -80,10 +158,19 @@ class MCTS:
         self.root_node: TreeNode | None = None
         self.logger = mcts_config.metric_logger
         self.logger.start()
+        # virtual loss and the policy batcher are only active while a tree-parallel run is in flight
+        self._virtual_loss = 0
+        self._tree_lock = threading.Lock()
+        self._policy_batcher: BatchedPolicyEvaluator | None = None
+        # transposition cache of policy evaluations, keyed by the board's Zobrist hash
+        self._policy_eval_cache: dict[int, tuple] = {}
+        # bind the UCB implementation once instead of branching on the config per selection
+        self._best_child_ix = self._muzero_best_child_ix if self.config.use_muzero else self._csabas_best_child_ix
+        # raw outcome counts; the ratios are only derived when a log step fires
         self.rollout_metrics = {
-            "won_ratio": 0.,
-            "draw_ratio": 0.,
-            "lost_ratio": 0.,
+            "won": 0,
+            "draw": 0,
+            "lost": 0,
             "matches_played": 0,
         }
 
@@ -107,7 +194,14 @@ class MCTS:
 
         while current_node.is_expanded:
             # while the node has children, select the best child node as (p)UCT
-            next_action, next_children = self.select_children(current_node, tree_stats)
+            if self._virtual_loss:
+                with self._tree_lock:
+                    next_action, next_children = self.select_children(current_node, tree_stats)
+                    # discourage the other workers from descending the same path
+                    next_children.visit_count += self._virtual_loss
+                    next_children.value_sum -= self._virtual_loss
+            else:
+                next_action, next_children = self.select_children(current_node, tree_stats)
             _, reward, done, _, _ = env.step(next_action)
             tree_path.append(next_children)
             current_node = next_children
@@ -115,37 +209,57 @@ class MCTS:
         # when reaching an unexpanded node, expand it
         if not done:
             if self.policy_network:
-                last_board = env.game.board.to_numpy()
-                parent_hidden_state = tree_path[-2].hidden_state
-                policy_logits, hidden_state = self.policy_network.predict(last_board, parent_hidden_state)
+                # positions reached by transposed move orders share one evaluation
+                cache_key = env.game.board.zobrist_hash
+                cached = self._policy_eval_cache.get(cache_key)
+                if cached is not None:
+                    policy_logits, hidden_state = cached
+                else:
+                    last_board = env.game.board.to_numpy()
+                    # the root has no parent in the path, so the first expansion starts stateless
+                    parent_hidden_state = tree_path[-2].hidden_state if len(tree_path) > 1 else None
+                    evaluator = self._policy_batcher or self.policy_network
+                    policy_logits, hidden_state = evaluator.predict(last_board, parent_hidden_state)
+                    self._policy_eval_cache[cache_key] = (policy_logits, hidden_state)
             else:
                 policy_logits = None
                 hidden_state = None
-            current_node.expand(
-                ~env.game.current_player,
-                env.get_valid_actions(),
-                hidden_state=hidden_state,
-                policy_logits=policy_logits,
-            )
+            if self._virtual_loss:
+                with self._tree_lock:
+                    if not current_node.is_expanded:
+                        current_node.expand(
+                            ~env.game.current_player,
+                            env.get_valid_actions(),
+                            hidden_state=hidden_state,
+                            policy_logits=policy_logits,
+                        )
+            else:
+                current_node.expand(
+                    ~env.game.current_player,
+                    env.get_valid_actions(),
+                    hidden_state=hidden_state,
+                    policy_logits=policy_logits,
+                )
 
         # simulate to the end of the game and return the path and end reward to backpropagate
-        while not done:
-            next_action = np.random.choice(env.get_valid_actions())
-            _, reward, done, _, _ = env.step(next_action)
-        winner = env.game.game_data.winner
+        if done:
+            winner = env.game.game_data.winner
+        else:
+            # finish the game with the compiled playout on a scratch copy of the board
+            board = env.game.board.to_numpy().copy()
+            empties = env.get_valid_actions().astype(np.int64)
+            winner_tag = random_playout(board, empties, 1 if env.game.current_player == PlayerEnum.BLACK else -1)
+            winner = PlayerEnum.BLACK if winner_tag == 1 else PlayerEnum.WHITE if winner_tag == -1 else None
+            # all evaluators score a finished game independently of the final board
+            reward = env.board_evaluator.evaluate_board(env.game.board, winner, end_game=True) if winner else 0
         self.rollout_metrics["matches_played"] += 1
         if winner is None:
-            self.rollout_metrics["draw_ratio"] = (
-                self.rollout_metrics["draw_ratio"] * (self.rollout_metrics["matches_played"] - 1) + 1
-            ) / self.rollout_metrics["matches_played"]
+            outcome = "draw"
         elif winner == starting_player:
-            self.rollout_metrics["won_ratio"] = (
-                self.rollout_metrics["won_ratio"] * (self.rollout_metrics["matches_played"] - 1) + 1
-            ) / self.rollout_metrics["matches_played"]
+            outcome = "won"
         else:
-            self.rollout_metrics["lost_ratio"] = (
-                self.rollout_metrics["lost_ratio"] * (self.rollout_metrics["matches_played"] - 1) + 1
-            ) / self.rollout_metrics["matches_played"]
+            outcome = "lost"
+        self.rollout_metrics[outcome] += 1
         return tree_path, reward, winner
 
     def run(self, env: GomokuEnv, visualise_policy: bool = False) -> Move:
@@ -159,31 +273,49 @@ class MCTS:
         * Backpropagation: Backpropagate the results of the simulation to the root node.
 
         The loop is repeated for a given number of simulations, and the best move is returned at the end.
+
+        If the config asks for more than one worker, the simulations are instead spread over worker
+        processes via root parallelization.
         """
+        if self.config.max_workers > 1:
+            if self.config.tree_parallelism:
+                return self._run_tree_parallel(env)
+            return self._run_root_parallel(env)
         starting_player = env.game.current_player
         self.tree_stats = TreeStats()
+        self._policy_eval_cache.clear()
         self.root_node = TreeNode(
             prior=self.config.initial_prior,
             to_play=starting_player,
         )
 
+        # one snapshot of the starting position serves every rollout
+        snapshot = env.snapshot()
         for n in range(self.config.num_simulations):
-            cloned_env_ = deepcopy(env)
-            tree_path, end_value, winner = self._single_rollout(self.root_node, self.tree_stats, cloned_env_)
+            tree_path, end_value, winner = self._single_rollout(self.root_node, self.tree_stats, env)
+            env.restore(snapshot)
             self._backpropagate(tree_path, end_value, winner, self.tree_stats)
-            next_board_value = [child.value() for child in self.root_node.children.values()]
             if n % 1000 == 0:
                 print(f"Done with {n}/{self.config.num_simulations} simulations.")
-                next_board_value_np = np.array(next_board_value).reshape(env.game.board.size)
-                self.logger.log_array("next_board_value", next_board_value_np)
-
-            metrics = self.rollout_metrics.copy()
-            metrics.update({
-                "max_next_board_value": max(next_board_value),
-                "min_next_board_value": min(next_board_value),
-                "mean_next_board_value": np.mean(next_board_value),
-            })
-            self.logger.log(metrics)
+                next_board_value = self.root_node.child_W / np.maximum(self.root_node.child_N, 1)
+                # the root only fans out over the currently valid actions, so scatter the child
+                # values to their board cells before reshaping to the full board
+                board_value = np.zeros(env.game.board.num_cells, dtype=np.float32)
+                board_value[self.root_node.child_actions] = next_board_value
+                self.logger.log_array("next_board_value", board_value.reshape(env.game.board.size))
+                matches_played = max(self.rollout_metrics["matches_played"], 1)
+                metrics = {
+                    "won_ratio": self.rollout_metrics["won"] / matches_played,
+                    "draw_ratio": self.rollout_metrics["draw"] / matches_played,
+                    "lost_ratio": self.rollout_metrics["lost"] / matches_played,
+                    "matches_played": self.rollout_metrics["matches_played"],
+                }
+                metrics.update({
+                    "max_next_board_value": next_board_value.max(),
+                    "min_next_board_value": next_board_value.min(),
+                    "mean_next_board_value": next_board_value.mean(),
+                })
+                self.logger.log(metrics)
 
         # once the simulation is done, return best Move
         best_action, _ = self.select_children(self.root_node, self.tree_stats)
@@ -193,41 +325,143 @@ class MCTS:
 
         return Move(player=starting_player, position=GridPosition.from_int(best_action, board_size=env.game.board.size))
 
+    def _run_root_parallel(self, env: GomokuEnv) -> Move:
+        """
+        Run the simulations with root parallelization.
+
+        Each worker process grows its own tree from the current position with a share of the
+        simulation budget and a distinct seed. The visit counts of the root children are then summed
+        across workers, and the most visited action wins the vote. No tree state is shared, so the
+        workers scale without synchronisation.
+        """
+        starting_player = env.game.current_player
+        num_workers = self.config.max_workers
+        worker_config = replace(
+            self.config,
+            max_workers=1,
+            num_simulations=max(1, self.config.num_simulations // num_workers),
+            metric_logger=NoopLoggingConnector(),
+        )
+        total_visits = np.zeros(env.game.board.num_cells, dtype=np.int64)
+        with cf.ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = [
+                executor.submit(_run_worker_simulations, env, worker_config, seed, self.policy_network)
+                for seed in range(num_workers)
+            ]
+            for future in cf.as_completed(futures):
+                actions, visits = future.result()
+                total_visits[actions] += visits
+        best_action = int(total_visits.argmax())
+        return Move(player=starting_player, position=GridPosition.from_int(best_action, board_size=env.game.board.size))
+
+    def _run_tree_parallel(self, env: GomokuEnv) -> Move:
+        """
+        Run the simulations with tree parallelization and virtual loss.
+
+        All the threaded workers descend a single shared tree. While a worker traverses a child, a
+        virtual loss is added to its statistics so that the other workers are steered towards
+        different paths; the loss is reverted when the true result is backpropagated. Threads only
+        pay off when the expensive part of a rollout releases the GIL (e.g. a policy network
+        forward pass); for plain rollouts, prefer root parallelization.
+        """
+        starting_player = env.game.current_player
+        self.tree_stats = TreeStats()
+        self.root_node = TreeNode(
+            prior=self.config.initial_prior,
+            to_play=starting_player,
+        )
+        num_workers = self.config.max_workers
+        simulations_per_worker = max(1, self.config.num_simulations // num_workers)
+        self._virtual_loss = self.config.virtual_loss
+        if self.policy_network is not None:
+            self._policy_batcher = BatchedPolicyEvaluator(self.policy_network, self.config.eval_batch_size)
+
+        def run_worker_rollouts(worker_env: GomokuEnv):
+            snapshot = worker_env.snapshot()
+            for _ in range(simulations_per_worker):
+                tree_path, end_value, winner = self._single_rollout(self.root_node, self.tree_stats, worker_env)
+                worker_env.restore(snapshot)
+                self._backpropagate(tree_path, end_value, winner, self.tree_stats)
+
+        try:
+            with cf.ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = [executor.submit(run_worker_rollouts, env.clone()) for _ in range(num_workers)]
+                for future in cf.as_completed(futures):
+                    future.result()
+        finally:
+            self._virtual_loss = 0
+            if self._policy_batcher is not None:
+                self._policy_batcher.close()
+                self._policy_batcher = None
+
+        best_action, _ = self.select_children(self.root_node, self.tree_stats)
+        return Move(player=starting_player, position=GridPosition.from_int(best_action, board_size=env.game.board.size))
+
     def _backpropagate(
         self, tree_path: list[TreeNode], end_value: float, winner: PlayerEnum | None, tree_stats: TreeStats
     ):
-        for node in tree_path:
-            node.value_sum += end_value if node.to_play == winner else -end_value
-            node.visit_count += 1
-            tree_stats.update(node.value())
+        if self._virtual_loss:
+            # the lock also serialises the TreeStats min/max store, so the stats stay race-free
+            with self._tree_lock:
+                self._apply_backprop(tree_path, end_value, winner, tree_stats)
+        else:
+            self._apply_backprop(tree_path, end_value, winner, tree_stats)
+
+    def _apply_backprop(
+        self, tree_path: list[TreeNode], end_value: float, winner: PlayerEnum | None, tree_stats: TreeStats
+    ):
+        values = np.empty(len(tree_path))
+        for i, node in enumerate(tree_path):
+            delta = end_value if node.to_play == winner else -end_value
+            if node.parent is None:
+                node.value_sum += delta
+                node.visit_count += 1
+                values[i] = node.value()
+            else:
+                # write the parent's SoA arrays directly, skipping the property indirection
+                parent, ix = node.parent, node.parent_ix
+                if self._virtual_loss:
+                    # revert the virtual loss before applying the true update
+                    parent.child_N[ix] -= self._virtual_loss
+                    parent.child_W[ix] += self._virtual_loss
+                parent.child_N[ix] += 1
+                parent.child_W[ix] += delta
+                values[i] = parent.child_W[ix] / parent.child_N[ix]
+        tree_stats.update_batch(values)
 
     def select_children(self, node: TreeNode, tree_stats: TreeStats) -> tuple[int, TreeNode]:
-        scores = []
-        for action, child_node in node.children.items():
-            scores.append((self.compute_ucb_score(child_node, node.visit_count, tree_stats), action, child_node))
-        _, best_action, best_child_node = max(scores, key=lambda x: x[0])
-        return best_action, best_child_node
-
-    def compute_ucb_score(self, node: TreeNode, parent_visit_count: int, tree_stats: TreeStats) -> float:
-        """Compute the UCB score for a node. If use_muzero is True, use the Muzero formula, otherwise use Csabas formula."""
-        if self.config.use_muzero:
-            return self._compute_ucb_score_muzero(node, parent_visit_count, tree_stats)
-        prior_score = self.config.ct * node.prior * np.sqrt(parent_visit_count) / (1 + node.visit_count)
-        if node.visit_count == 0:
-            return prior_score
-        return prior_score + tree_stats.normalise(node.value())
-
-    def _compute_ucb_score_muzero(self, node: TreeNode, parent_visit_count: int, tree_stats: TreeStats) -> float:
-        """Compute the UCB score for a node using the Muzero formula (B.2) in https://arxiv.org/pdf/1911.08265."""
-        # Prior for the state-action pair, P(s, a)
-        p_s_a = node.prior
-        # UCB fraction, sqrt(sum_b N(s,b)) / (N(s, a) + 1)
-        ucb_frac = np.sqrt(parent_visit_count) / (1 + node.visit_count)
+        """Select the child with the best UCB score. The scoring implementation is bound once from the config."""
+        best_ix = self._best_child_ix(node, tree_stats)
+        best_action = int(node.child_actions[best_ix])
+        return best_action, node.child(best_action, best_ix)
+
+    def _csabas_best_child_ix(self, node: TreeNode, tree_stats: TreeStats) -> int:
+        """Best child index under Csabas UCB formula, via the compiled argmax kernel."""
+        return int(
+            ucb_argmax(
+                node.child_prior, node.child_N, node.child_W, node.visit_count, self.config.ct, tree_stats.minimum,
+                tree_stats.maximum
+            )
+        )
+
+    def _muzero_best_child_ix(self, node: TreeNode, tree_stats: TreeStats) -> int:
+        """Best child index under the MuZero UCB formula."""
+        return int(self._compute_ucb_scores_muzero(node, tree_stats).argmax())
+
+    def _compute_ucb_scores_muzero(self, node: TreeNode, tree_stats: TreeStats) -> np.ndarray:
+        """Compute the UCB scores of all children using the Muzero formula (B.2) in https://arxiv.org/pdf/1911.08265."""
+        parent_visit_count = node.visit_count
+        # Priors for the state-action pairs, P(s, a)
+        p_s_a = node.child_prior
+        # UCB fraction, sqrt(sum_b N(s,b)) / (N(s, a) + 1); the numerator and the log correction
+        # only depend on the parent, so compute them once as scalars rather than per child
+        ucb_frac = math.sqrt(parent_visit_count) / (1 + node.child_N)
         # MuZero introduces a log-correction to Csabas UCB formula
-        log_correction = np.log((parent_visit_count + self.config.mu_ct_second + 1) / self.config.mu_ct_second)
+        log_correction = math.log((parent_visit_count + self.config.mu_ct_second + 1) / self.config.mu_ct_second)
         # The exploration term in the UCB is just given by,
         exploration_term = p_s_a * ucb_frac * (self.config.mu_ct + log_correction)
-        return exploration_term + tree_stats.normalise(node.value())
+        values = node.child_W / np.maximum(node.child_N, 1)
+        return exploration_term + tree_stats.normalise(values)
 
     def plot_policy_for_node(
         self,
@@ -242,7 +476,15 @@ class MCTS:
         Plots the policy as a heatmap for the given node. It can also store the plot in the current working
         directory under the given filename.
         """
-        all_children_v = np.array([c.value() for c in node.children.values()]).reshape(board_size)
+        # plotting is off the hot path, so only pull in the heavy libraries when asked to plot
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        # scatter the child values to their board cells; the node only fans out over the actions
+        # that were valid in its position
+        all_children_v = np.zeros(board_size[0] * board_size[1], dtype=np.float32)
+        all_children_v[node.child_actions] = node.child_W / np.maximum(node.child_N, 1)
+        all_children_v = all_children_v.reshape(board_size)
 
         # make plot with seaborn and store it if necessary
         plt.figure(figsize=(8, 8))
@@ -253,3 +495,19 @@ class MCTS:
             print(f"Stored heatmap of policy in {os.getcwd()}/{plot_filename}_{time.time()}")
 
         plt.show()
+
+
+def _run_worker_simulations(
+    env: GomokuEnv,
+    config: MCTSConfig,
+    seed: int,
+    policy_network: torch.nn.Module | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Run one worker's share of simulations on a private tree and return the root visit counts."""
+    np.random.seed(seed)
+    seed_playout_rng(seed)
+    mcts = MCTS(policy_network=policy_network, mcts_config=config)
+    mcts.run(env)
+    root = mcts.root_node
+    assert root is not None and root.child_actions is not None, "Worker did not expand the root node"
+    return root.child_actions, root.child_N.copy()
@@ -1,12 +1,106 @@
-from dataclasses import dataclass, field
+import math
+from dataclasses import dataclass
 
 import numpy as np
 from game.gomoku_utils import PlayerEnum
+from numba import njit
 
 
-@dataclass
+@njit(cache=True)
+def ucb_argmax(
+    child_prior: np.ndarray,
+    child_N: np.ndarray,
+    child_W: np.ndarray,
+    parent_visit_count: int,
+    ct: float,
+    stats_min: float,
+    stats_max: float,
+) -> int:
+    """
+    Return the index of the child with the highest UCB score.
+
+    Compiled single-pass scan over the structure-of-arrays child statistics. It tracks the running
+    maximum instead of materialising the score vector, so no temporary arrays are allocated. Values
+    are normalised with the tree statistics, mirroring TreeStats.normalise.
+    """
+    sqrt_parent = math.sqrt(parent_visit_count)
+    normalise = stats_max > stats_min
+    inv_range = 1.0 / (stats_max - stats_min) if normalise else 1.0
+    best_score = -np.inf
+    best_ix = 0
+    for i in range(child_prior.shape[0]):
+        score = ct * child_prior[i] * sqrt_parent / (1.0 + child_N[i])
+        if child_N[i] > 0:
+            value = child_W[i] / child_N[i]
+            if normalise:
+                value = (value - stats_min) * inv_range
+            score += value
+        if score > best_score:
+            best_score = score
+            best_ix = i
+    return best_ix
+
+
+@njit(cache=True)
+def seed_playout_rng(seed: int):
+    """Seed the internal numba random state used by random_playout."""
+    np.random.seed(seed)
+
+
+@njit(cache=True)
+def random_playout(board: np.ndarray, empties: np.ndarray, to_play: int) -> int:
+    """
+    Play uniformly random moves on a scratch board until the game ends.
+
+    The board is the int32 array from GomokuBoard.to_numpy (1 for black, -1 for white, 0 empty) and
+    `empties` holds the flat indices of the free cells; both are mutated in place. Moves are drawn
+    by swap-removing a random entry from `empties`, and the five-in-a-row check only scans the four
+    lines through the last move. Returns the winner tag (1 black, -1 white, 0 draw). The whole
+    playout runs as compiled integer code, with no Python objects in the loop.
+    """
+    w, h = board.shape
+    dxs = np.array([1, 0, 1, 1], dtype=np.int64)
+    dys = np.array([0, 1, 1, -1], dtype=np.int64)
+    n_empty = empties.shape[0]
+    player = to_play
+    while n_empty > 0:
+        ix = np.random.randint(n_empty)
+        pos = empties[ix]
+        empties[ix] = empties[n_empty - 1]
+        n_empty -= 1
+        x = pos // w
+        y = pos % w
+        board[x, y] = player
+        for d in range(4):
+            dx = dxs[d]
+            dy = dys[d]
+            count = 1
+            nx, ny = x + dx, y + dy
+            while 0 <= nx < w and 0 <= ny < h and board[nx, ny] == player:
+                count += 1
+                nx += dx
+                ny += dy
+            nx, ny = x - dx, y - dy
+            while 0 <= nx < w and 0 <= ny < h and board[nx, ny] == player:
+                count += 1
+                nx -= dx
+                ny -= dy
+            if count >= 5:
+                return player
+        player = -player
+    return 0
+
+
+@dataclass(slots=True)
 class TreeStats:
-    """Node statistics, including the maximum and mininum values in the tree."""
+    """
+    Node statistics, including the maximum and mininum values in the tree.
+
+    The instance is not internally synchronised: concurrent tree-parallel workers must update it
+    under the tree lock, which backpropagation already holds. Updates are batched per rollout via
+    `update_batch`, so the stats cost one min/max store pair per simulation rather than one per
+    node, keeping the critical section short without atomic compare-exchange machinery.
+    """
     maximum: float = -np.inf
     minimum: float = np.inf
 
@@ -14,32 +108,117 @@ class TreeStats:
         self.maximum = max(self.maximum, value)
         self.minimum = min(self.minimum, value)
 
-    def normalise(self, value: float):
+    def update_batch(self, values: np.ndarray):
+        """Update the statistics with a whole vector of values in one shot."""
+        self.maximum = max(self.maximum, float(values.max()))
+        self.minimum = min(self.minimum, float(values.min()))
+
+    def normalise(self, value):
         """Normalise the value between 0 and 1. Only normalise if the maximum and mininum has been set."""
         if self.maximum > self.minimum:
             return (value - self.minimum) / (self.maximum - self.minimum)
         return value
 
 
-@dataclass
 class TreeNode:
-    """Node in the MCTS tree."""
-    prior: float
-    """Prior probability of selecting the node."""
-    visit_count: int = 0
-    """Visit count of the node."""
-    to_play: PlayerEnum | None = None
-    """Player to play at the node."""
-    children: dict[int, "TreeNode"] = field(default_factory=dict)
-    """Children of the node."""
-    value_sum: float = 0.0
-    """Sum of the values of the games obtained by traversing the node."""
-    # extra info to use with neural networks
-    hidden_state: np.ndarray | None = None
-    """Hidden state of the node."""
+    """
+    Node in the MCTS tree.
+
+    The statistics of the children (prior, visit count and value sum) are stored as parallel numpy
+    arrays on the parent node, i.e. as a structure of arrays, so that the UCB scores of all children
+    can be computed in a single vectorised expression instead of a per-child Python loop. A node
+    therefore reads its own statistics from its parent; the root node, which has no parent, keeps
+    local scalar fields instead.
+
+    The class uses __slots__ since a search allocates one node per traversed edge: it shrinks each
+    instance by skipping the per-object __dict__ and makes attribute access an offset load.
+    """
+    __slots__ = (
+        "to_play",
+        "parent",
+        "parent_ix",
+        "children",
+        "hidden_state",
+        "reward",
+        "child_actions",
+        "child_prior",
+        "child_N",
+        "child_W",
+        "_prior",
+        "_visit_count",
+        "_value_sum",
+    )
+
+    def __init__(
+        self,
+        prior: float,
+        to_play: PlayerEnum | None = None,
+        parent: "TreeNode | None" = None,
+        parent_ix: int = -1,
+    ):
+        """Initialise the node."""
+        self.to_play = to_play
+        self.parent = parent
+        self.parent_ix = parent_ix
+        self.children: dict[int, "TreeNode"] = {}
+        # extra info to use with neural networks
+        self.hidden_state: np.ndarray | None = None
+        self.reward: float = 0.0
+        # structure-of-arrays statistics of the children, allocated on expansion
+        self.child_actions: np.ndarray | None = None
+        self.child_prior: np.ndarray | None = None
+        self.child_N: np.ndarray | None = None
+        self.child_W: np.ndarray | None = None
+        # local statistics, only read when the node has no parent to hold them
+        self._prior = prior
+        self._visit_count = 0
+        self._value_sum = 0.0
+
+    @property
+    def prior(self) -> float:
+        """Prior probability of selecting the node."""
+        if self.parent is None:
+            return self._prior
+        return float(self.parent.child_prior[self.parent_ix])
+
+    @prior.setter
+    def prior(self, value: float):
+        if self.parent is None:
+            self._prior = value
+        else:
+            self.parent.child_prior[self.parent_ix] = value
+
+    @property
+    def visit_count(self) -> int:
+        """Visit count of the node."""
+        if self.parent is None:
+            return self._visit_count
+        return int(self.parent.child_N[self.parent_ix])
+
+    @visit_count.setter
+    def visit_count(self, value: int):
+        if self.parent is None:
+            self._visit_count = value
+        else:
+            self.parent.child_N[self.parent_ix] = value
+
+    @property
+    def value_sum(self) -> float:
+        """Sum of the values of the games obtained by traversing the node."""
+        if self.parent is None:
+            return self._value_sum
+        return float(self.parent.child_W[self.parent_ix])
+
+    @value_sum.setter
+    def value_sum(self, value: float):
+        if self.parent is None:
+            self._value_sum = value
+        else:
+            self.parent.child_W[self.parent_ix] = value
+
     @property
     def is_expanded(self) -> bool:
-        return len(self.children) != 0
+        return self.child_actions is not None
 
     def value(self) -> float:
         if self.visit_count == 0:
@@ -57,22 +236,45 @@ class TreeNode:
         """
         Expand the node by adding children.
 
-        The prior is computed from the policy logits, if given. Otherwise, it is set to 1.
+        The prior is computed from the policy logits, if given. Otherwise, it is set to 1. The
+        statistics of the children are allocated as parallel arrays on this node.
         """
         assert actions.ndim == 1, f"Expect the dimensions in the actions array to be (1,), but got {actions.ndim}"
         self.to_play = to_play
         self.hidden_state = hidden_state
         self.reward = reward
         if policy_logits is None:
-            policy_logits = np.zeros(len(actions))
-        norm_sum = np.sum(np.exp(policy_logits))
-        probs = np.exp(policy_logits) / norm_sum
-        self.children = {action: TreeNode(prior=probs[ix]) for ix, action in enumerate(actions.tolist())}
+            # no network: the softmax of all-zero logits is uniform, so fill it directly
+            probs = np.full(len(actions), 1.0 / len(actions), dtype=np.float32)
+        else:
+            # stable softmax: shift by the maximum so exp cannot overflow, then exponentiate
+            # and normalise in place on a single float32 buffer
+            probs = np.asarray(policy_logits, dtype=np.float32) - np.max(policy_logits)
+            np.exp(probs, out=probs)
+            probs /= probs.sum()
+        self.child_actions = np.asarray(actions, dtype=np.int32)
+        self.child_prior = probs
+        self.child_N = np.zeros(len(actions), dtype=np.int32)
+        self.child_W = np.zeros(len(actions), dtype=np.float32)
+
+    def child(self, action: int, child_ix: int) -> "TreeNode":
+        """
+        Return the child node for an action, materialising it lazily on first visit.
+
+        The statistics of every child already live in the parent's arrays, so a TreeNode object is
+        only needed for children that are actually traversed; expanding a node allocates none.
+        """
+        node = self.children.get(action)
+        if node is None:
+            node = TreeNode(prior=float(self.child_prior[child_ix]), parent=self, parent_ix=child_ix)
+            self.children[action] = node
+        return node
 
     def add_exploration_noise(self, dirichlet_alpha: float, exploration_fraction: float):
         """In the root node, add Dirichlet noise to the prior of the children. This is the recipe used in the AlphaZero-like papers."""
-        valid_actions = list(self.children.keys())
-        noise = np.random.dirichlet([dirichlet_alpha] * len(valid_actions))
-        for action, n in zip(valid_actions, noise):
-            self.children[action
-                         ].prior = self.children[action].prior * (1 - exploration_fraction) + n * exploration_fraction
+        if self.child_actions is None:
+            return
+        noise = np.random.dirichlet(np.full(len(self.child_actions), dirichlet_alpha))
+        # blend in place on the prior array rather than looping child by child
+        self.child_prior *= 1.0 - exploration_fraction
+        self.child_prior += exploration_fraction * noise.astype(np.float32)
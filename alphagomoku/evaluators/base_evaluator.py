@@ -1,7 +1,5 @@
 from abc import abstractmethod
-from copy import deepcopy
 
-import numpy as np
 from game.gomoku import GomokuGame
 from game.gomoku_utils import GomokuBoard, Move, PlayerEnum
 
@@ -15,11 +13,12 @@ class BaseEvaluator:
         return self.evaluate_board(game.board, game.current_player, game.game_data.winner is not None)
 
     def evaluate_move(self, game: GomokuGame, move: Move) -> int:
-        """Evaluate the board after a move without modifying it, and return a score."""
-        game_ = deepcopy(game)
-        from_player = move.player
-        is_winning = game_.make_move(move)
-        return self.evaluate_board(game_.board, from_player, is_winning)
+        """Evaluate the board after a move without modifying the game, by making and unmaking the move."""
+        is_winning = game.make_move(move)
+        try:
+            return self.evaluate_board(game.board, move.player, is_winning)
+        finally:
+            game.unmake_move()
 
     @abstractmethod
     def evaluate_board(self, board: GomokuBoard, from_player: PlayerEnum, end_game: bool) -> int:
@@ -30,7 +29,7 @@ class BaseEvaluator:
 
     def _evaluate_end_game(self, board: GomokuBoard) -> int:
         """Evaluate the board at the end of the game. By default, return the size of the board."""
-        return np.prod(board.size, dtype=int)
+        return board.num_cells
 
 
 class DummyEvaluator(BaseEvaluator):
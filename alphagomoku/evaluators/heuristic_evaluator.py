@@ -1,6 +1,55 @@
 import numpy as np
 from evaluators.base_evaluator import MAX_END_GAME_SCORE, BaseEvaluator
-from game.gomoku_utils import GomokuBoard, GridPosition, Move, PlayerEnum
+from game.gomoku_utils import GomokuBoard, PlayerEnum
+from numba import njit
+
+# The eight scan directions, in the same order as the original per-cell loop
+_DXS = np.array([-1, -1, -1, 0, 0, 1, 1, 1], dtype=np.int64)
+_DYS = np.array([-1, 0, 1, -1, 1, -1, 0, 1], dtype=np.int64)
+
+
+@njit(cache=True)
+def _heuristic_scan(padded: np.ndarray, weights: np.ndarray, x0: int, x1: int, y0: int, y1: int,
+                    pad: int) -> np.ndarray:
+    """
+    Score the empty cells in the given window, from BLACK's perspective.
+
+    Compiled scalar scan over the padded board: for each empty cell the chain in each of the eight
+    directions is measured (owner, length capped at five, open/semi-open/closed ends) and the cell
+    scores its best chain, signed by the chain owner. Runs as pure integer code with no temporary
+    arrays, which keeps small window re-evaluations cheap.
+    """
+    out = np.zeros((x1 - x0, y1 - y0), dtype=np.int64)
+    for i in range(x0, x1):
+        for j in range(y0, y1):
+            if padded[pad + i, pad + j] != 0:
+                continue
+            best = 0
+            best_owner = 0
+            for d in range(8):
+                dx = _DXS[d]
+                dy = _DYS[d]
+                owner = padded[pad + i + dx, pad + j + dy]
+                if owner != 1 and owner != -1:
+                    continue
+                length = 0
+                open_end = 0
+                for k in range(1, 7):
+                    cell = padded[pad + i + k * dx, pad + j + k * dy]
+                    if cell != owner:
+                        if cell == 0:
+                            open_end = 1
+                        break
+                    length += 1
+                if length > 5:
+                    length = 5
+                ends = open_end + (1 if padded[pad + i - dx, pad + j - dy] == 0 else 0)
+                value = ends * weights[length]
+                if value > best:
+                    best = value
+                    best_owner = owner
+            out[i - x0, j - y0] = best if best_owner == 1 else -best
+    return out
 
 
 class HeuristicEvaluator(BaseEvaluator):
@@ -16,83 +65,97 @@ class HeuristicEvaluator(BaseEvaluator):
     The score of each structure is its length times a weight. The final score is the sum of the scores of all the
     structures for the player minus the sum of the scores of the structures for the opponent.
     """
+
+    # Padding value for off-board cells: distinct from empty (0) and both players (1/-1)
+    _OFF_BOARD = 2
+
+    # A chain scan from a cell reads at most 6 cells away, so a stone only changes the
+    # values of cells within this radius of it
+    _WINDOW_RADIUS = 6
+
+    # Bound on the number of cached position scores before the oldest entries are evicted
+    _MAX_CACHED_SCORES = 100_000
+
     def __init__(self):
         super().__init__()
         self.tabular_value_fn: np.ndarray | None = None
-        self.tabular_value_fn_opp: np.ndarray | None = None
         # Align scores with the number of cells in a row
         self.score_weights = np.array([0, 1, 3, 9, 27, 1000])
+        # cached state of the last evaluated board, used for incremental re-evaluation
+        self._cached_board: np.ndarray | None = None
+        self._cached_tab: np.ndarray | None = None
+        self._cached_total: int = 0
+        self._padded: np.ndarray | None = None
+        # transposition cache of BLACK-perspective scores keyed by Zobrist hash, FIFO-bounded
+        self._score_cache: dict[int, int] = {}
 
     def evaluate_board(self, board: GomokuBoard, from_player: PlayerEnum, end_game: bool) -> int:
-        """Evaluate the board and return a score."""
+        """
+        Evaluate the board and return a score.
+
+        Mid-game scores are cached by the Zobrist hash of the position, so transpositions reached
+        through different move orders are scored once. The cache holds the BLACK-perspective total
+        and is bounded: once full, the oldest entries are evicted first.
+        """
         if end_game:
             return self._evaluate_end_game(board)
-        return self._evaluate_board(board, from_player)
+        key = board.zobrist_hash
+        total = self._score_cache.get(key)
+        if total is None:
+            total = self._evaluate_board(board, PlayerEnum.BLACK)
+            if len(self._score_cache) >= self._MAX_CACHED_SCORES:
+                del self._score_cache[next(iter(self._score_cache))]
+            self._score_cache[key] = total
+        return total if from_player == PlayerEnum.BLACK else -total
 
     def _evaluate_end_game(self, board: GomokuBoard) -> int:
         """Evaluate the board at the end of the game."""
         return MAX_END_GAME_SCORE
 
     def _evaluate_board(self, board: GomokuBoard, from_player: PlayerEnum) -> int:
-        """Evaluate the board in the middle of the game."""
-        self.tabular_value_fn = np.zeros((board.size), dtype=int)
-        x, y = board.size
-        for i in range(x):
-            for j in range(y):
-                cell_owner = board[GridPosition(i, j)].get_player()
-                if cell_owner is not None:
-                    chain_value = 0
-                else:
-                    chain_value = self._get_cell_value(board, i, j, from_player)
-                self.tabular_value_fn[i, j] = chain_value
-        return self.tabular_value_fn.sum()
-
-    def _get_cell_value(self, board: GomokuBoard, x: int, y: int, from_player: PlayerEnum) -> int:
-        """Get the characteristics of a chain."""
-        cell_values: list[tuple[int, PlayerEnum | None]] = []
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
-                    continue
-                cell_values += [self._get_value_helper_fn(board, x, y, dx, dy)]
-        max_value, played_by = max(cell_values, key=lambda x: x[0])
-        player_multiplier = 1 if played_by == from_player else -1
-        return player_multiplier * max_value
-
-    def _is_valid_position(self, board: GomokuBoard, x: int, y: int) -> bool:
-        """Check if a position is valid."""
-        return 0 <= x < board.size[0] and 0 <= y < board.size[1]
-
-    def _get_value_helper_fn(self, board: GomokuBoard, x: int, y: int, dx: int,
-                             dy: int) -> tuple[int, PlayerEnum | None]:
-        """Get the value of a chain."""
-        length = 0
-        chain_owner = None
-        ends = [False, False]
-        if self._is_valid_position(board, x - dx, y - dy):
-            # check if the cell prior to the chain is empty
-            ends[0] = board[GridPosition(x - dx, y - dy)].get_player() is None
-        while True:
-            x += dx
-            y += dy
-            if not self._is_valid_position(board, x, y):
-                # if going outside of the bounds of the board just break
-                break
-            # assign player that owns the cell, if any
-            current_player = board[GridPosition(x, y)].get_player()
-            if current_player is None:
-                # if no one owns the cell, the chain is broken and open-ended, break
-                ends[1] = True
-                break
-            if chain_owner is None:
-                # if the chain has no owner, assign the owner
-                chain_owner = current_player
-            if chain_owner != current_player:
-                # if the cell is owned by the opponent, the chain is broken and closed-ended, break
-                break
-            # otherwise, it is owned by the current player, increase the length of the chain by 1
-            length += 1
-        # assign multiplier to the chain based on: open, semi-open, closed as (2, 1, 0)
-        chain_end_multiplier = sum(ends)
-
-        return chain_end_multiplier * self.score_weights[length], chain_owner
+        """
+        Evaluate the board in the middle of the game.
+
+        The per-cell values are cached between calls, from BLACK's perspective (the score for WHITE
+        is the exact negative). When the board differs from the cached one by a single stone, only
+        the cells within the scan window of that stone are re-evaluated and the total is adjusted by
+        their delta; any other change triggers a full re-evaluation.
+        """
+        arr = board.to_numpy()
+        w, h = board.size
+        pad = self._WINDOW_RADIUS
+        if (self._cached_board is not None and self._cached_board.shape == arr.shape):
+            diff = np.argwhere(arr != self._cached_board)
+            if len(diff) == 0:
+                return self._signed_total(arr, from_player)
+            if len(diff) == 1:
+                x, y = map(int, diff[0])
+                self._padded[pad + x, pad + y] = arr[x, y]
+                self._cached_board[x, y] = arr[x, y]
+                x0, x1 = max(0, x - pad), min(w, x + pad + 1)
+                y0, y1 = max(0, y - pad), min(h, y + pad + 1)
+                window = self._scan_values(arr, x0, x1, y0, y1)
+                self._cached_total += int(window.sum()) - int(self._cached_tab[x0:x1, y0:y1].sum())
+                self._cached_tab[x0:x1, y0:y1] = window
+                return self._signed_total(arr, from_player)
+
+        self._padded = np.full((w + 2 * pad, h + 2 * pad), self._OFF_BOARD, dtype=np.int32)
+        self._padded[pad:pad + w, pad:pad + h] = arr
+        self._cached_board = arr.copy()
+        self._cached_tab = self._scan_values(arr, 0, w, 0, h)
+        self._cached_total = int(self._cached_tab.sum())
+        return self._signed_total(arr, from_player)
+
+    def _signed_total(self, arr: np.ndarray, from_player: PlayerEnum) -> int:
+        """Return the cached total from the perspective of `from_player`, updating the tabular values."""
+        if self.tabular_value_fn is None or self.tabular_value_fn.shape != self._cached_tab.shape:
+            self.tabular_value_fn = np.empty_like(self._cached_tab)
+        if from_player == PlayerEnum.BLACK:
+            np.copyto(self.tabular_value_fn, self._cached_tab)
+            return self._cached_total
+        np.negative(self._cached_tab, out=self.tabular_value_fn)
+        return -self._cached_total
+
+    def _scan_values(self, arr: np.ndarray, x0: int, x1: int, y0: int, y1: int) -> np.ndarray:
+        """Evaluate the cells in the given window, from BLACK's perspective, with the compiled scan."""
+        return _heuristic_scan(self._padded, self.score_weights, x0, x1, y0, y1, self._WINDOW_RADIUS)
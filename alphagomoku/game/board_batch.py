@@ -0,0 +1,53 @@
+"""Preallocated board batches for feeding leaf evaluations to the network in one forward pass.
+
+Evaluating positions one board at a time leaves the GPU idle between tiny kernels; collecting
+leaves into a contiguous int8 tensor amortizes the launch and transfer cost across the batch.
+"""
+import numpy as np
+
+from game.gomoku_utils import GomokuBoard
+
+
+class BoardBatch:
+    """A fixed-capacity batch of board snapshots backed by one contiguous int8 buffer."""
+    def __init__(self, capacity: int, board_size: tuple[int, int] = (15, 15)):
+        """Initialise the batch with a preallocated (capacity, W, H) buffer."""
+        assert capacity > 0, "capacity must be positive"
+        self.capacity = capacity
+        self.buf = np.zeros((capacity, *board_size), dtype=np.int8)
+        self._n = 0
+
+    def __len__(self) -> int:
+        """Return the number of boards collected so far."""
+        return self._n
+
+    @property
+    def is_full(self) -> bool:
+        """Return whether the batch has reached capacity."""
+        return self._n == self.capacity
+
+    def collect(self, board: GomokuBoard) -> int:
+        """Snapshot a board into the next slot (one contiguous 225-byte copy) and return its index."""
+        assert self._n < self.capacity, "BoardBatch is full"
+        board.to_numpy(out=self.buf[self._n])
+        self._n += 1
+        return self._n - 1
+
+    def clear(self):
+        """Reset the batch for reuse without releasing the buffer."""
+        self._n = 0
+
+    def to_tensor(self, device=None):
+        """
+        Return the collected boards as a float32 torch tensor ready for the model.
+
+        When a CUDA device is given the host buffer is pinned and the copy made non-blocking, so
+        the transfer overlaps with leaf selection for the next batch.
+        """
+        # imported here so numpy-only consumers of the batch never pay for (or require) torch
+        import torch
+
+        tensor = torch.from_numpy(self.buf[:self._n])
+        if device is not None and str(device) != "cpu":
+            tensor = tensor.pin_memory().to(device, non_blocking=True)
+        return tensor.float()
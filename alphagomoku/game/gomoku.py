@@ -1,3 +1,4 @@
+import base64
 import json
 import os
 from dataclasses import dataclass, field
@@ -8,7 +9,7 @@ from game.gomoku_utils import GomokuBoard, GridPosition, Move, PlayerEnum, Start
 MoveHistory = list[Move]
 
 
-@dataclass
+@dataclass(slots=True)
 class GomokuGameData:
     """Class to store the game data."""
     moves: MoveHistory = field(default_factory=list)
@@ -16,19 +17,30 @@ class GomokuGameData:
     winning_move: Move | None = None
 
     def to_dict(self) -> dict:
-        """Convert the game data to a dictionary."""
+        """
+        Convert the game data to a dictionary.
+
+        The move history is packed into a single (N, 3) int16 array of (player, x, y) rows and
+        base64-encoded, one buffer for the whole game instead of a dict per move.
+        """
+        packed = np.array([(m.player.to_int(), m.position.x, m.position.y) for m in self.moves], dtype=np.int16)
         return {
-            "moves": [move.to_dict() for move in self.moves],
+            "moves_b64": base64.b64encode(packed.tobytes()).decode("ascii"),
             "winner": self.winner.value if self.winner else None,
             "winning_move": self.winning_move.to_dict() if self.winning_move else None,
         }
 
     @classmethod
     def from_dict(cls, data: dict) -> "GomokuGameData":
-        """Initialise the game data from a dictionary."""
+        """Initialise the game data from a dictionary, accepting the older list-of-dicts format too."""
         winner = PlayerEnum(data["winner"]) if data["winner"] else None
+        if "moves_b64" in data:
+            packed = np.frombuffer(base64.b64decode(data["moves_b64"]), dtype=np.int16).reshape(-1, 3)
+            moves = [Move(PlayerEnum.from_int(int(p)), GridPosition(int(x), int(y))) for p, x, y in packed]
+        else:
+            moves = [Move.from_dict(move) for move in data["moves"]]
         return cls(
-            moves=[Move.from_dict(move) for move in data["moves"]],
+            moves=moves,
             winner=winner,
             winning_move=Move.from_dict(data["winning_move"]) if data["winning_move"] else None,
         )
@@ -36,6 +48,9 @@ class GomokuGameData:
 
 class GomokuGame:
     """Class to represent a game of Gomoku."""
+
+    __slots__ = ("starting_rule", "current_player", "is_initialised", "is_reset", "board", "game_data", "_turn")
+
     def __init__(self, starting_rule: StartingRule = StartingRule.BASIC, board_size: int | tuple[int, int] = 15):
         """Initialise the game."""
         self.starting_rule: StartingRule = starting_rule
@@ -56,15 +71,32 @@ class GomokuGame:
         if not self.is_initialised and not dry_run:
             self._apply_initial_move_rule(initial_move=[move])
         else:
-            self.board.make_move(move)
+            # dry-run moves come from stored games and are known to be legal
+            self.board.make_move(move, validate=not dry_run)
         if not dry_run:
             self.game_data.moves.append(move)
-            if self.check_winner():
+            # with alternating players the mover cannot have five stones before the 9th move,
+            # so the winner check is skipped entirely in the opening
+            if len(self.game_data.moves) >= 9 and self.check_winner():
                 self.game_data.winner = move.player
                 self.game_data.winning_move = move
             self.current_player = (PlayerEnum.WHITE if self.current_player == PlayerEnum.BLACK else PlayerEnum.BLACK)
         self._turn += 1
-        return self.game_data.winner is not None or len(self.get_available_positions()) == 0
+        return self.game_data.winner is not None or self.board.get_available_actions().size == 0
+
+    def unmake_move(self) -> Move:
+        """Undo the last move, restoring the game to the state before it was made."""
+        assert self.game_data.moves, "No moves have been made yet."
+        move = self.game_data.moves.pop()
+        self.board.undo_move(move)
+        if self.game_data.winning_move == move:
+            self.game_data.winner = None
+            self.game_data.winning_move = None
+        self.current_player = ~self.current_player
+        self._turn -= 1
+        if not self.game_data.moves:
+            self.is_initialised = False
+        return move
 
     def store_game_data(self, filename: str = "gamedata.json"):
         """Store the moves of the game as a JSON string."""
@@ -81,17 +113,31 @@ class GomokuGame:
             game.game_data = GomokuGameData.from_dict(json.load(f))
         game.board = GomokuBoard()    # Reset the board
 
-        last_move = game.game_data.moves[-1] if game.game_data.moves else None
         for move in game.game_data.moves:
             game.make_move(move, dry_run=True)
-        if last_move and last_move.player == PlayerEnum.BLACK:
-            game.current_player = PlayerEnum.WHITE
-        else:
-            game.current_player = PlayerEnum.BLACK
+        # BLACK starts, so the side to move follows directly from the parity of the move count
+        game.current_player = PlayerEnum.WHITE if len(game.game_data.moves) % 2 else PlayerEnum.BLACK
         if print_board:
             game.display_board()
         return game
 
+    def clone(self) -> "GomokuGame":
+        """Return an independent copy of the game, without the cost of a deepcopy."""
+        other = GomokuGame(starting_rule=self.starting_rule, board_size=self.board.size)
+        other.board = self.board.clone()
+        other.current_player = self.current_player
+        other.is_initialised = self.is_initialised
+        other.is_reset = self.is_reset
+        other._turn = self._turn
+        if self.is_reset:
+            # moves are never mutated once made, so the history can share them
+            other.game_data = GomokuGameData(
+                moves=list(self.game_data.moves),
+                winner=self.game_data.winner,
+                winning_move=self.game_data.winning_move,
+            )
+        return other
+
     def display_board(self):
         """Display the current state of the board."""
         return self.board.display_board()
@@ -105,39 +151,16 @@ class GomokuGame:
         return self.board.get_available_positions_mask()
 
     def check_winner(self) -> bool:
-        """Check if the player has won the game after the last move."""
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
+        """
+        Check if the player has won the game after the last move.
+
+        Only the lines through the last move can contain a new five-in-a-row, so the check reads
+        the board's incrementally maintained line bitboards in O(1).
+        """
         last_move = self.game_data.moves[-1] if self.game_data.moves else None
         assert last_move, "No moves have been made yet."
 
-        x, y = last_move.position()
-        player = last_move.player
-
-        def count_consecutive(d: tuple[int, int]):
-            count = 1
-            w_size, h_size = self.board.size
-            dx, dy = d
-            # Check in the positive direction
-            for i in range(1, 5):
-                nx, ny = x + i * dx, y + i * dy
-                if (0 <= nx < w_size and 0 <= ny < h_size and self.board[GridPosition(nx, ny)].get_player() == player):
-                    count += 1
-                else:
-                    break
-            # Check in the negative direction
-            for i in range(1, 5):
-                nx, ny = x - i * dx, y - i * dy
-                if (0 <= nx < w_size and 0 <= ny < h_size and self.board[GridPosition(nx, ny)].get_player() == player):
-                    count += 1
-                else:
-                    break
-            return count
-
-        for d in directions:
-            count = count_consecutive(d)
-            if count >= 5:
-                return True
-        return False
+        return self.board.has_five_in_a_row(last_move.position.x, last_move.position.y, last_move.player)
 
     def reset(self):
         """Reset the game board."""
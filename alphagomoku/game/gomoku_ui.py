@@ -1,7 +1,6 @@
 import os
 import sys
 from dataclasses import dataclass
-from enum import Enum
 
 from game.gomoku import GomokuGame
 from game.gomoku_utils import GridPosition, Move, PlayerEnum
@@ -19,11 +18,9 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
-
-class RenderMode(str, Enum):
-    """Render mode for the environment."""
-    CMD = "cmd"
-    UI = "ui"
+# RenderMode lives in the Qt-free env module so headless code can import it without pulling in
+# PyQt5; re-exported here for back-compat
+from rl_env.env import RenderMode    # noqa: F401
 
 
 @dataclass
@@ -39,6 +36,9 @@ class GomokuGameUI(QWidget):
         self._board_size = game.board.size
         self.config = ui_config
         self._last_move_ix: int | None = None
+        # stone items already on the scene, keyed by board position, so redraws never
+        # rebuild or double-draw existing stones
+        self._stones: dict[tuple[int, int], QGraphicsEllipseItem] = {}
 
         self._init_ui()
         self._draw_board()
@@ -76,10 +76,11 @@ class GomokuGameUI(QWidget):
 
         self.scene.addRect(0, 0, width * cell_size, height * cell_size, pen)
 
+        # draw each grid line once; the horizontal lines used to be re-added width times over
         for i in range(width):
             self.scene.addLine(i * cell_size, 0, i * cell_size, height * cell_size, Qt.black)    # type: ignore
-            for j in range(height):
-                self.scene.addLine(0, j * cell_size, width * cell_size, j * cell_size, Qt.black)    # type: ignore
+        for j in range(height):
+            self.scene.addLine(0, j * cell_size, width * cell_size, j * cell_size, Qt.black)    # type: ignore
 
         if self._game.turn != 0:
             for move in self._game.game_data.moves:
@@ -96,6 +97,8 @@ class GomokuGameUI(QWidget):
 
     def draw_stone(self, position: GridPosition, player: PlayerEnum):
         row, col = position()
+        if (row, col) in self._stones:
+            return
         cell_size = self.config.cell_size
         stone_radius = self.config.stone_radius
 
@@ -109,6 +112,7 @@ class GomokuGameUI(QWidget):
         stone.setBrush(color)
         stone.setPen(outline)
         self.scene.addItem(stone)
+        self._stones[(row, col)] = stone
 
     def mousePressEvent(self, event):    # type: ignore
         if event.button() == Qt.LeftButton:    # type: ignore
@@ -118,7 +122,8 @@ class GomokuGameUI(QWidget):
             move = Move(current_player, GridPosition(x, y))
             try:
                 is_winning = self._game.make_move(move)
-                self.draw_stone(move.position, current_player)
+                # route through update_board so the drawn state tracks the move history
+                self.update_board()
                 print(move)
                 if is_winning:
                     print(f"Player {current_player.value} wins!")
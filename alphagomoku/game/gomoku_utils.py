@@ -14,6 +14,15 @@ class PlayerEnum(Enum):
         """Return the opponent player."""
         return PlayerEnum.BLACK if self == PlayerEnum.WHITE else PlayerEnum.WHITE
 
+    def to_int(self) -> int:
+        """Return the integer cell tag used by the array-based hot paths: 1 for BLACK, -1 for WHITE."""
+        return 1 if self is PlayerEnum.BLACK else -1
+
+    @classmethod
+    def from_int(cls, value: int) -> "PlayerEnum":
+        """Return the player for an integer cell tag."""
+        return PlayerEnum.BLACK if value == 1 else PlayerEnum.WHITE
+
 
 class StartingRule(Enum):
     """Enum to represent the starting rule."""
@@ -22,7 +31,7 @@ class StartingRule(Enum):
     SWAP2 = "Swap2"
 
 
-@dataclass
+@dataclass(slots=True)
 class GridPosition:
     """Data class to represent the position on the game board."""
     x: int
@@ -47,7 +56,7 @@ class GridPosition:
         return cls(value // board_size[0], value % board_size[1])
 
 
-@dataclass
+@dataclass(slots=True)
 class Move:
     """Data class to represent a move."""
     player: PlayerEnum
@@ -63,88 +72,270 @@ class Move:
         return cls(PlayerEnum(data["player"]), GridPosition(*data["position"]))
 
 
-class GomokuCell:
-    """Class to represent a cell on the game board."""
-    def __init__(self):
-        """Initialise the cell."""
-        self._current_player: PlayerEnum | None = None
-
-    @property
-    def is_occupied(self) -> bool:
-        """Check if the cell is occupied."""
-        return self._current_player is not None
-
-    def get_player(self) -> PlayerEnum | None:
-        """Return the player controlling the cell."""
-        return self._current_player
+class GomokuBoard:
+    """
+    Class to represent the Gomoku game board.
 
-    def set_player(self, player: PlayerEnum):
-        """Set the player controlling the cell. If the cell is already occupied, raise an error."""
-        assert self._current_player is None, "Cell is already occupied"
-        self._current_player = player
+    The board is stored as a single int8 numpy array with 1 for BLACK, -1 for WHITE and 0 for an
+    empty cell, so the whole 15x15 grid fits in a few cache lines and every read is a direct array
+    load rather than a chain of cell-object attribute lookups.
+    """
 
+    # Zobrist key tables shared across boards of the same size, generated once with a fixed seed
+    _zobrist_tables: dict[tuple[int, int], np.ndarray] = {}
+    # per-size map of cell -> (line id, bit index) for every line of length >= 5 through the cell
+    _line_tables: dict[tuple[int, int], tuple[list[list[tuple[int, int]]], int]] = {}
 
-class GomokuBoard:
-    """Class to represent the Gomoku game board."""
     def __init__(self, size: int | tuple[int, int] = 15):
         """Initialise the board."""
         if isinstance(size, tuple):
             self._w_size, self._h_size = size
         else:
             self._w_size = self._h_size = size
-        self._board: list[list[GomokuCell]] = [[GomokuCell() for _ in range(self._w_size)] for _ in range(self._h_size)]
-        self._board_np = np.zeros((self._w_size, self._h_size), dtype=np.int32)
-        self._available_positions = [GridPosition(x, y) for x in range(self._w_size) for y in range(self._h_size)]
+        self._n_cells = self._w_size * self._h_size
+        # the backing storage is padded by one row/column (e.g. 16x16 for the default board) so
+        # batched stacks of boards avoid power-of-two stride aliasing; all accesses go through
+        # the unpadded view
+        self._storage = np.zeros((self._w_size + 1, self._h_size + 1), dtype=np.int8)
+        self._board = self._storage[:self._w_size, :self._h_size]
         self._available_position_mask = np.ones(self._w_size * self._h_size, dtype=np.int32)
+        # read-only alias handed out by get_available_positions_mask, so callers cannot corrupt
+        # the incrementally maintained state through the returned array
+        self._available_position_mask_view = self._available_position_mask.view()
+        self._available_position_mask_view.setflags(write=False)
+        # flat action indices maintained incrementally with swap-removal; the first _n_valid
+        # entries are the currently available actions and _action_ix maps action -> slot
+        self._valid_actions = np.arange(self._w_size * self._h_size, dtype=np.int32)
+        self._action_ix = np.arange(self._w_size * self._h_size, dtype=np.int32)
+        self._n_valid = self._w_size * self._h_size
+        self._zobrist_table = self._get_zobrist_table((self._w_size, self._h_size))
+        self._zobrist_hash = np.uint64(0)
+        # per-player bitboards of the stones on each winnable line, updated incrementally
+        self._cell_lines, n_lines = self._get_line_table((self._w_size, self._h_size))
+        self._line_bits: list[list[int]] = [[0] * n_lines, [0] * n_lines]
+
+    @classmethod
+    def _get_zobrist_table(cls, size: tuple[int, int]) -> np.ndarray:
+        """Return the (player, position) table of random 64-bit Zobrist keys for a board size."""
+        table = cls._zobrist_tables.get(size)
+        if table is None:
+            rng = np.random.default_rng(0x60B0)
+            table = rng.integers(0, 2**64, size=(2, size[0] * size[1]), dtype=np.uint64)
+            cls._zobrist_tables[size] = table
+        return table
+
+    def key(self) -> bytes:
+        """
+        Return the raw board bytes as an exact position key.
+
+        Unlike the Zobrist hash this is collision-free, at the cost of copying the board; it is
+        hashable and compares with a C-level memcmp, so it works directly as a dict key for
+        transposition tables that cannot tolerate hash collisions.
+        """
+        return self._board.tobytes()
+
+    @classmethod
+    def _get_line_table(cls, size: tuple[int, int]) -> tuple[list[list[tuple[int, int]]], int]:
+        """
+        Return the cell -> (line id, bit index) table for a board size, building it once.
+
+        A line is a maximal row, column or diagonal of length at least five; a 15x15 board has 72
+        of them. Each cell lies on at most four, so make_move can update the line bitboards with a
+        handful of integer ops.
+        """
+        cached = cls._line_tables.get(size)
+        if cached is not None:
+            return cached
+        w, h = size
+        cell_lines: list[list[tuple[int, int]]] = [[] for _ in range(w * h)]
+        n_lines = 0
+        starts = [(x, 0, 0, 1, h) for x in range(w)]    # rows
+        starts += [(0, y, 1, 0, w) for y in range(h)]    # columns
+        starts += [(x, 0, 1, 1, min(w - x, h)) for x in range(w)]    # diagonals, down-right
+        starts += [(0, y, 1, 1, min(w, h - y)) for y in range(1, h)]
+        starts += [(x, h - 1, 1, -1, min(w - x, h)) for x in range(w)]    # diagonals, up-right
+        starts += [(0, y, 1, -1, min(w, y + 1)) for y in range(h - 1)]
+        for x0, y0, dx, dy, length in starts:
+            if length < 5:
+                continue
+            for bit in range(length):
+                cell_lines[(x0 + bit * dx) * w + (y0 + bit * dy)].append((n_lines, bit))
+            n_lines += 1
+        cls._line_tables[size] = (cell_lines, n_lines)
+        return cell_lines, n_lines
+
+    def has_five_in_a_row(self, x: int, y: int, player: PlayerEnum) -> bool:
+        """
+        Check whether the stone at (x, y) is part of five in a row for the player.
+
+        Reads the incrementally maintained line bitboards: for each of the at most four lines
+        through the cell, five consecutive stones reduce to four shift-and-ANDs on one integer, so
+        the whole check is branch-light constant work.
+        """
+        bits = self._line_bits[0 if player == PlayerEnum.BLACK else 1]
+        for line_id, _ in self._cell_lines[x * self._w_size + y]:
+            b = bits[line_id]
+            if b & (b >> 1) & (b >> 2) & (b >> 3) & (b >> 4):
+                return True
+        return False
 
-    def __getitem__(self, position: GridPosition) -> GomokuCell:
-        pos_x, pos_y = position()
-        return self._board[pos_x][pos_y]
+    @property
+    def zobrist_hash(self) -> int:
+        """Return the Zobrist hash of the position, maintained incrementally by make_move/undo_move."""
+        return int(self._zobrist_hash)
+
+    def __getitem__(self, position: "GridPosition | tuple[int, int]") -> int:
+        """Return the cell value at the position: 1 for BLACK, -1 for WHITE, 0 for empty."""
+        # accept a plain (x, y) tuple so hot loops need not allocate a GridPosition per access
+        if isinstance(position, tuple):
+            pos_x, pos_y = position
+        else:
+            pos_x, pos_y = position.x, position.y
+        return self._board[pos_x, pos_y]
 
     def __repr__(self):
         """Print out board as a string."""
         return self._get_board_state_string()
 
-    def to_numpy(self) -> np.ndarray:
-        """Return the board as a numpy array."""
-        return self._board_np
+    def to_numpy(self, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Return the board as a numpy array.
+
+        By default this is a live view that is overwritten by subsequent moves — the zero-copy
+        contract the env's step path relies on. Callers that need a stable snapshot pass a
+        preallocated `out` buffer, which is filled in place without any per-call allocation.
+        """
+        if out is None:
+            return self._board
+        np.copyto(out, self._board)
+        return out
 
     @property
     def size(self) -> tuple[int, int]:
         """Return the size of the board."""
         return self._w_size, self._h_size
 
+    @property
+    def num_cells(self) -> int:
+        """Return the total number of cells on the board."""
+        return self._n_cells
+
     @property
     def available_positions(self) -> list[GridPosition]:
-        """Return the available moves on the board."""
-        return self._available_positions
+        """
+        Return the available moves on the board.
+
+        The list is derived lazily from the availability mask; moves only flip a mask entry, so
+        make_move never pays the O(N) list.remove this property used to require.
+        """
+        return [
+            GridPosition(int(i) // self._w_size,
+                         int(i) % self._w_size) for i in np.flatnonzero(self._available_position_mask == 1)
+        ]
 
     def get_available_positions_mask(self) -> np.ndarray:
-        """Return the available moves as a mask."""
-        return self._available_position_mask
+        """Return the available moves as a mask. The array is a read-only view, maintained incrementally."""
+        return self._available_position_mask_view
+
+    def get_available_actions(self) -> np.ndarray:
+        """Return the available moves as flat action indices. The returned array is a view, in no particular order."""
+        return self._valid_actions[:self._n_valid]
+
+    def _remove_valid_action(self, action: int):
+        """Swap-remove an action from the valid-action array in O(1)."""
+        ix = self._action_ix[action]
+        self._n_valid -= 1
+        last = self._valid_actions[self._n_valid]
+        self._valid_actions[ix] = last
+        self._action_ix[last] = ix
+        self._valid_actions[self._n_valid] = action
+        self._action_ix[action] = self._n_valid
+
+    def _restore_valid_action(self, action: int):
+        """Swap an action back into the valid region of the valid-action array in O(1)."""
+        ix = self._action_ix[action]
+        other = self._valid_actions[self._n_valid]
+        self._valid_actions[ix] = other
+        self._action_ix[other] = ix
+        self._valid_actions[self._n_valid] = action
+        self._action_ix[action] = self._n_valid
+        self._n_valid += 1
 
     def _check_valid_move(self, move: Move):
         """Check if the move is valid. A move is valid if the position is within the board and the cell is not occupied."""
-        position_x, position_y = move.position()
-        assert (0 <= position_x <= self._w_size), f"Move x-value must be between 0 and {self._w_size}, got {position_x}"
-        assert (0 <= position_y <= self._h_size), f"Move y-value must be between 0 and {self._h_size}, got {position_y}"
-        assert self[move.position].get_player() is None, f"Cell is already occupied, tried {move.position}"
-
-    def make_move(self, move: Move):
-        """Make a move on the board."""
-        self._check_valid_move(move)
-        self[move.position].set_player(move.player)
-        self._available_positions.remove(move.position)
-        self._available_position_mask[move.position.x * self._w_size + move.position.y] = -1
-        self._board_np[move.position.x, move.position.y] = 1 if move.player == PlayerEnum.BLACK else -1
+        position_x, position_y = move.position.x, move.position.y
+        assert (0 <= position_x < self._w_size), f"Move x-value must be between 0 and {self._w_size - 1}, got {position_x}"
+        assert (0 <= position_y < self._h_size), f"Move y-value must be between 0 and {self._h_size - 1}, got {position_y}"
+        assert self._board[position_x, position_y] == 0, f"Cell is already occupied, tried {move.position}"
+
+    def make_move(self, move: Move, validate: bool = True):
+        """
+        Make a move on the board.
+
+        Validation can be skipped for moves that are known to be legal, e.g. when replaying a
+        stored game, leaving only the raw state updates on that path.
+        """
+        if validate:
+            self._check_valid_move(move)
+        self.make_move_raw(move.player.to_int(), move.position.x, move.position.y)
+
+    def make_move_raw(self, player: int, x: int, y: int):
+        """
+        Place a stone given its integer cell tag (1 BLACK, -1 WHITE), skipping Move objects.
+
+        This is the allocation-free entry point for array-based callers; `make_move` wraps it for
+        code that works with Move objects. The move is assumed to be legal.
+        """
+        flat = x * self._w_size + y
+        self._board[x, y] = player
+        self._available_position_mask[flat] = -1
+        self._remove_valid_action(flat)
+        player_ix = 0 if player == 1 else 1
+        self._zobrist_hash ^= self._zobrist_table[player_ix, flat]
+        line_bits = self._line_bits[player_ix]
+        for line_id, bit in self._cell_lines[flat]:
+            line_bits[line_id] |= 1 << bit
+
+    def undo_move(self, move: Move):
+        """Undo a move on the board, freeing its cell and making the position available again."""
+        self.undo_move_raw(move.player.to_int(), move.position.x, move.position.y)
+
+    def undo_move_raw(self, player: int, x: int, y: int):
+        """Undo a stone given its integer cell tag, mirroring `make_move_raw`."""
+        flat = x * self._w_size + y
+        self._board[x, y] = 0
+        self._available_position_mask[flat] = 1
+        self._restore_valid_action(flat)
+        player_ix = 0 if player == 1 else 1
+        self._zobrist_hash ^= self._zobrist_table[player_ix, flat]
+        line_bits = self._line_bits[player_ix]
+        for line_id, bit in self._cell_lines[flat]:
+            line_bits[line_id] &= ~(1 << bit)
+
+    def clone(self) -> "GomokuBoard":
+        """
+        Return an independent copy of the board.
+
+        Much cheaper than deepcopy: the numpy state is copied in bulk and the immutable Zobrist
+        table stays shared.
+        """
+        other = GomokuBoard((self._w_size, self._h_size))
+        other._board[:] = self._board
+        other._available_position_mask[:] = self._available_position_mask
+        other._valid_actions = self._valid_actions.copy()
+        other._action_ix = self._action_ix.copy()
+        other._n_valid = self._n_valid
+        other._zobrist_hash = self._zobrist_hash
+        other._line_bits = [list(self._line_bits[0]), list(self._line_bits[1])]
+        return other
 
     def _get_board_state_string(self) -> str:
         """Utility method to generate the board as string for debugging purposes."""
 
         board_str = ""
 
-        def cell_repr(cell: GomokuCell):
-            return " " if not cell.get_player() else cell.get_player().value    # type: ignore
+        def cell_repr(cell: int):
+            return " " if cell == 0 else (PlayerEnum.BLACK.value if cell == 1 else PlayerEnum.WHITE.value)
 
         horizontal_line = "=" * (17 * 4)
         column_numbers = "   " + "".join(f" {i:2} " for i in range(15))
@@ -2,11 +2,12 @@ import os
 import sys
 from collections.abc import Callable
 
-from game.gomoku_ui import GomokuGameUI, RenderMode
+import numpy as np
 from game.gomoku_utils import PlayerEnum
 from players.base_player import BasePlayer
-from PyQt5.QtWidgets import QApplication
-from rl_env.env import GomokuEnv
+from players.random_player import RandomPlayer
+from rl_env.env import GomokuEnv, RenderMode
+from rl_env.numba_rollout import play_random_game
 
 PlayerFn = Callable[[GomokuEnv], BasePlayer]
 
@@ -19,14 +20,25 @@ class GomokuMatch:
         player_white_fn: PlayerFn,
         env: GomokuEnv,
         use_ui: bool = False,
+        verbose: bool = False,
     ):
         self.env = env
+        # board dumps and the winner line cost more than the moves themselves; self-play and
+        # benchmark harnesses keep this off
+        self._verbose = verbose
         self.player_black = player_black_fn(env)
         self.player_white = player_white_fn(env)
+        # indexed by side to move in the play loop, avoiding an enum compare per turn
+        self._players = (self.player_black, self.player_white)
         self._render_mode = RenderMode.UI if use_ui else RenderMode.CMD
 
-        # setup ui if render mode is UI
+        # setup ui if render mode is UI; PyQt5 is only imported on this path so headless
+        # self-play never loads Qt
         if use_ui:
+            from PyQt5.QtWidgets import QApplication
+
+            from game.gomoku_ui import GomokuGameUI
+
             os.environ["QT_QPA_PLATFORM"] = "wayland" if sys.platform == "linux" else "xlge"
             self._app = QApplication(sys.argv)
             self._ui = GomokuGameUI(self.env.game)
@@ -35,18 +47,31 @@ class GomokuMatch:
         """Play a match between the two players."""
         self.env.reset()
         done = False
+        ix = 0 if self.env.game.current_player is PlayerEnum.BLACK else 1
         while not done:
-            if self.env.game.current_player == PlayerEnum.BLACK:
-                done = self.player_black.play_turn()
-            else:
-                done = self.player_white.play_turn()
+            done = self._players[ix].play_turn()
+            ix ^= 1
             if self._render_mode == RenderMode.UI:
                 # TODO: fix UI rendering
                 self._ui.update_board()
-            else:
+            elif self._verbose:
                 self.env.render()
-            if done:
-                print(f"The winner is of the game is {self.env.game.game_data.winner}")
+        if self._verbose:
+            print(f"The winner is of the game is {self.env.game.game_data.winner}")
+
+    def fast_play(self, seed: int = 0) -> PlayerEnum | None:
+        """
+        Play one random-vs-random game through the jit-compiled rollout kernel.
+
+        Skips the env/Move/rendering machinery entirely, so no move history or game data is
+        recorded — this path exists for rollout throughput, not for replayable matches. Returns
+        the winner, or None on a draw.
+        """
+        assert isinstance(self.player_black, RandomPlayer) and isinstance(self.player_white, RandomPlayer), \
+            "fast_play only supports RandomPlayer vs RandomPlayer"
+        board = np.zeros(self.env.game.board.size, dtype=np.int8)
+        winner = play_random_game(board, PlayerEnum.BLACK.to_int(), seed)
+        return PlayerEnum.from_int(winner) if winner else None
 
 
 if __name__ == "__main__":
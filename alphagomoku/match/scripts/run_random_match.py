@@ -7,6 +7,6 @@ if __name__ == '__main__':
     env = GomokuEnv(board_evaluator=DummyEvaluator(), render_mode=RenderMode.CMD)
     player_one = RandomPlayer
     player_two = RandomPlayer
-    match = GomokuMatch(player_one, player_two, env)
+    match = GomokuMatch(player_one, player_two, env, verbose=True)
 
     match.play()
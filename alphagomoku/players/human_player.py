@@ -1,3 +1,5 @@
+import sys
+
 from players.base_player import BasePlayer
 from rl_env.env import GomokuEnv, RenderMode
 
@@ -6,14 +8,26 @@ class HumanPlayer(BasePlayer):
     """A human controlled player that can play moves in the game."""
     def __init__(self, env: GomokuEnv):
         super().__init__(env)
+        self._board_cols = env.game.board.size[0]
 
     def play_turn(self) -> bool:
         """If the render mode is UI, wait for the user to make a move. Else, ask for an input from the CMD."""
         if self.env._render_mode == RenderMode.UI:
             done = self.env._ui.wait_for_human_move()
         else:
-            user_input = input("Enter the move to play with coords (row, column): ")
-            row, col = user_input.split(",")
-            action = int(row) * self.env.game.board.size[0] + int(col)
-            _, _, done, _, _ = self.env.step(action)
+            _, _, done, _, _ = self.env.step(self._read_action())
         return done
+
+    def _read_action(self) -> int:
+        """Read a 'row,column' move from stdin, reprompting on malformed input instead of crashing."""
+        while True:
+            print("Enter the move to play with coords (row, column): ", end="", flush=True)
+            line = sys.stdin.readline()
+            if not line:
+                # readline returns "" forever once stdin is closed; bail out like input() would
+                raise EOFError("stdin closed while waiting for a move")
+            try:
+                row_s, col_s = line.split(",", 1)
+                return int(row_s) * self._board_cols + int(col_s)
+            except ValueError:
+                print("Invalid move, expected 'row,column' with integer coordinates.")
@@ -1,3 +1,6 @@
+import os
+import sys
+from enum import Enum
 from typing import Any
 
 import gymnasium as gym
@@ -11,6 +14,12 @@ from game.gomoku_utils import GridPosition, Move, StartingRule
 StepReturnType = tuple[np.ndarray, float, bool, bool, dict]
 
 
+class RenderMode(str, Enum):
+    """Render mode for the environment."""
+    CMD = "cmd"
+    UI = "ui"
+
+
 class GomokuEnv(gym.Env):
     """Gomoku environment for reinforcement learning."""
     def __init__(
@@ -19,17 +28,27 @@ class GomokuEnv(gym.Env):
         board_size: int | tuple[int, int] = 15,
         starting_rule: StartingRule = StartingRule.BASIC,
         save_board: bool = False,
+        render_mode: RenderMode = RenderMode.CMD,
     ):
         """Initialise the environment."""
         self.game: GomokuGame = GomokuGame(starting_rule=starting_rule, board_size=board_size)
-        self.action_space: gym.Space = gym.spaces.Discrete(np.prod(self.game.board.size))
+        self.action_space: gym.Space = gym.spaces.Discrete(self.game.board.num_cells)
         self.observation_space: gym.Space = gym.spaces.Box(low=0, high=2, shape=self.game.board.size, dtype=np.int8)
+        # cached for the per-step range check; gymnasium's Discrete.contains costs an isinstance
+        # chain and an int coercion on every call
+        self._n_actions = self.game.board.num_cells
+        self._board_size = self.game.board.size
 
         self.board_evaluator = board_evaluator
         self._is_reset = False
         self._is_done = False
         self._save_board = save_board
         self._steps = 0
+        # the Qt subsystem is built lazily on the first UI render, so constructing envs (e.g.
+        # many of them for parallel self-play) never imports PyQt5 or spawns a QApplication
+        self._render_mode = render_mode
+        self._app = None
+        self._ui = None
 
     @property
     def is_done(self) -> bool:
@@ -42,9 +61,39 @@ class GomokuEnv(gym.Env):
         return self._is_terminated()
 
     def get_valid_actions(self) -> np.ndarray:
-        """Get the valid actions."""
-        action_mask = self.game.get_available_positions_mask()
-        return np.where(action_mask.flatten() == 1)[0]
+        """Get the valid actions. The array is maintained incrementally by the board, so this is O(1)."""
+        return self.game.board.get_available_actions()
+
+    def sample_valid_action(self, rng: np.random.Generator) -> int:
+        """
+        Sample a uniformly random valid action.
+
+        The draw indexes the incrementally maintained valid-action array, so it is O(1) and never
+        materialises a position list.
+        """
+        actions = self.game.board.get_available_actions()
+        assert actions.size > 0, "No valid actions left to sample"
+        return int(actions[int(rng.integers(actions.size))])
+
+    def clone(self) -> "GomokuEnv":
+        """
+        Return an independent copy of the environment.
+
+        The game state is cloned move-for-move; the board evaluator is recreated rather than
+        shared, so per-clone evaluator caches stay private (e.g. to a search worker thread).
+        Clones always render in CMD mode, since a process can hold only one QApplication.
+        """
+        other = GomokuEnv(
+            board_evaluator=type(self.board_evaluator)(),
+            board_size=self.game.board.size,
+            starting_rule=self.game.starting_rule,
+            save_board=self._save_board,
+        )
+        other.game = self.game.clone()
+        other._is_reset = self._is_reset
+        other._is_done = self._is_done
+        other._steps = self._steps
+        return other
 
     def reset(self) -> tuple[np.ndarray, dict[str, Any]]:    # type: ignore
         """Reset the environment."""
@@ -54,19 +103,53 @@ class GomokuEnv(gym.Env):
 
         return self.game.board.to_numpy(), {}
 
+    def snapshot(self) -> tuple:
+        """
+        Take a snapshot of the mutable game state, to be handed back to `restore`.
+
+        Only the scalar game state and the number of moves played are recorded; restoring unwinds
+        the moves made after the snapshot, which is far cheaper than deep-copying the environment.
+        """
+        game = self.game
+        return (
+            len(game.game_data.moves),
+            game.current_player,
+            game.is_initialised,
+            game.turn,
+            game.game_data.winner,
+            game.game_data.winning_move,
+            self._is_done,
+            self._steps,
+        )
+
+    def restore(self, snapshot: tuple):
+        """Restore the environment to a previously taken snapshot by unwinding the moves made since."""
+        n_moves, current_player, is_initialised, turn, winner, winning_move, is_done, steps = snapshot
+        moves = self.game.game_data.moves
+        while len(moves) > n_moves:
+            self.game.board.undo_move(moves.pop())
+        self.game.current_player = current_player
+        self.game.is_initialised = is_initialised
+        self.game._turn = turn
+        self.game.game_data.winner = winner
+        self.game.game_data.winning_move = winning_move
+        self._is_done = is_done
+        self._steps = steps
+
     def _is_terminated(self) -> bool:
         """Terminate the game and return True if the game is done. For now, we do not have a termination condition."""
         return self._is_done
 
     def _make_move_from_action(self, action: int) -> Move:
         """Make a move from the action."""
-        pos = GridPosition.from_int(action, board_size=self.game.board.size)
+        pos = GridPosition.from_int(action, board_size=self._board_size)
         return Move(self.game.current_player, pos)
 
     def step(self, action: int) -> StepReturnType:
         """Take a step in the environment."""
+        # plain int comparison instead of action_space.contains; the asserts compile out under -O
         assert self._is_reset, "Environment must be reset before taking a step"
-        assert self.action_space.contains(action), f"Invalid action: {action}"
+        assert 0 <= action < self._n_actions, f"Invalid action: {action}"
         assert self.game.game_data.winner is None, f"Game is already done after {self._steps} steps."
 
         self._is_done = self.game.make_move(self._make_move_from_action(action))
@@ -79,6 +162,44 @@ class GomokuEnv(gym.Env):
 
         return self.game.board.to_numpy(), reward, self._is_done, self._is_terminated(), {}
 
+    def step_fast(self, action: int) -> bool:
+        """
+        Take a step returning only whether the game is done.
+
+        Self-play and rollout loops discard the observation and reward, so this path skips the
+        evaluator call and observation entirely; the validation asserts are compiled out under
+        `python -O`.
+        """
+        if __debug__:
+            assert self._is_reset, "Environment must be reset before taking a step"
+            assert self.game.game_data.winner is None, f"Game is already done after {self._steps} steps."
+
+        self._is_done = self.game.make_move(self._make_move_from_action(action))
+        self._steps += 1
+
+        if self._save_board and self._is_done:
+            self.game.board.store_board()
+            self.game.store_game_data()
+        return self._is_done
+
+    def _ensure_ui(self):
+        """Create the QApplication and board UI on first use; PyQt5 is only imported here."""
+        if self._ui is not None:
+            return
+        from PyQt5.QtWidgets import QApplication
+
+        from game.gomoku_ui import GomokuGameUI
+
+        os.environ["QT_QPA_PLATFORM"] = "wayland" if sys.platform == "linux" else "xlge"
+        self._app = QApplication(sys.argv)
+        self._ui = GomokuGameUI(self.game)
+        self._ui.show()
+
     def render(self):
         """Render the environment."""
-        self.game.display_board()
+        if self._render_mode == RenderMode.UI:
+            self._ensure_ui()
+            self._ui.update_board()
+            self._app.processEvents()
+        else:
+            self.game.display_board()
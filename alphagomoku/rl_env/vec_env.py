@@ -0,0 +1,90 @@
+"""Batched Gomoku environments stepped in lockstep over a stacked board tensor.
+
+Running one game at a time leaves the per-step Python dispatch cost unamortized. GomokuVecEnv
+keeps B boards in one int8 (B, W, H) tensor plus flat per-env state arrays, so a single `step`
+advances every live game and random action sampling is one vectorized draw for the whole batch.
+"""
+import numpy as np
+
+from rl_env.numba_rollout import step_batch
+
+
+class GomokuVecEnv:
+    """A batch of independent Gomoku games advanced together, one action per env per step."""
+    def __init__(self, num_envs: int, board_size: int | tuple[int, int] = 15):
+        """Initialise the batch."""
+        assert num_envs > 0, "num_envs must be positive"
+        if isinstance(board_size, tuple):
+            self._w_size, self._h_size = board_size
+        else:
+            self._w_size = self._h_size = board_size
+        self.num_envs = num_envs
+        self._n_cells = self._w_size * self._h_size
+        self._boards = np.zeros((num_envs, self._w_size, self._h_size), dtype=np.int8)
+        self._current_player = np.ones(num_envs, dtype=np.int8)
+        self._done = np.zeros(num_envs, dtype=bool)
+        self._winners = np.zeros(num_envs, dtype=np.int8)
+        self._n_stones = np.zeros(num_envs, dtype=np.int32)
+        # per-env empty-cell arrays maintained with swap-removal, as on GomokuBoard, so random
+        # sampling never needs rejection even on nearly full boards
+        self._empty = np.tile(np.arange(self._n_cells, dtype=np.int32), (num_envs, 1))
+        self._empty_ix = self._empty.copy()
+        self._n_empty = np.full(num_envs, self._n_cells, dtype=np.int32)
+
+    @property
+    def boards(self) -> np.ndarray:
+        """Return the stacked (num_envs, W, H) board tensor. The array is a live view."""
+        return self._boards
+
+    @property
+    def dones(self) -> np.ndarray:
+        """Return the per-env done mask."""
+        return self._done
+
+    @property
+    def winners(self) -> np.ndarray:
+        """Return the per-env winner cell tags: 1 BLACK, -1 WHITE, 0 for drawn or running games."""
+        return self._winners
+
+    def reset(self) -> np.ndarray:
+        """Reset every env in the batch and return the board tensor."""
+        self._boards[:] = 0
+        self._current_player[:] = 1
+        self._done[:] = False
+        self._winners[:] = 0
+        self._n_stones[:] = 0
+        self._empty[:] = np.arange(self._n_cells, dtype=np.int32)
+        self._empty_ix[:] = self._empty
+        self._n_empty[:] = self._n_cells
+        return self._boards
+
+    def sample_valid_actions(self, rng: np.random.Generator) -> np.ndarray:
+        """Sample one uniformly random valid action per env in a single vectorized draw."""
+        # done envs have no valid action; clamp their range and let step ignore them
+        ix = rng.integers(np.maximum(self._n_empty, 1))
+        return self._empty[np.arange(self.num_envs), ix].astype(np.int32)
+
+    def step(self, actions: np.ndarray) -> np.ndarray:
+        """
+        Play one action in every live env and return the done mask.
+
+        Actions for envs that are already done are ignored. Every action must be a currently
+        empty cell of its board. The whole batch is advanced by one jitted kernel that
+        parallelizes across envs, so there is no per-env Python dispatch.
+        """
+        actions = np.asarray(actions, dtype=np.int32)
+        if __debug__:
+            played = self._boards.reshape(self.num_envs, -1)[np.arange(self.num_envs), actions]
+            assert not (played[~self._done] != 0).any(), "An action targets an occupied cell"
+        step_batch(
+            self._boards,
+            actions,
+            self._current_player,
+            self._done,
+            self._winners,
+            self._n_stones,
+            self._empty,
+            self._empty_ix,
+            self._n_empty,
+        )
+        return self._done
@@ -0,0 +1,89 @@
+"""GPU-resident batched Gomoku boards, mirroring GomokuVecEnv entirely on device.
+
+With large batches the per-step compute is trivial and the host<->device copies dominate, so the
+boards, side-to-move and termination state all live in torch tensors on one device: moves are
+scattered into the stacked board tensor and five-in-a-row detection is a handful of small
+convolutions over the whole batch. The tensors can be fed straight to the network with no copy.
+"""
+import torch
+import torch.nn.functional as F
+
+
+class GomokuVecEnvGPU:
+    """A batch of Gomoku games stepped in lockstep on a torch device, one action per env."""
+    def __init__(self, num_envs: int, board_size: int | tuple[int, int] = 15, device: str = "cuda"):
+        """Initialise the batch on the given device."""
+        assert num_envs > 0, "num_envs must be positive"
+        if isinstance(board_size, tuple):
+            self._w_size, self._h_size = board_size
+        else:
+            self._w_size = self._h_size = board_size
+        self.num_envs = num_envs
+        self.device = torch.device(device)
+        self._boards = torch.zeros((num_envs, self._w_size, self._h_size), dtype=torch.int8, device=self.device)
+        self._current_player = torch.ones(num_envs, dtype=torch.int8, device=self.device)
+        self._done = torch.zeros(num_envs, dtype=torch.bool, device=self.device)
+        self._winners = torch.zeros(num_envs, dtype=torch.int8, device=self.device)
+        # one convolution kernel per line direction; a window summing to five over the mover's
+        # 0/1 stone plane is exactly five in a row
+        eye = torch.eye(5, device=self.device)
+        self._win_kernels = (
+            torch.ones((1, 1, 1, 5), device=self.device),
+            torch.ones((1, 1, 5, 1), device=self.device),
+            eye.view(1, 1, 5, 5),
+            torch.flip(eye, (0, )).view(1, 1, 5, 5),
+        )
+
+    @property
+    def boards(self) -> torch.Tensor:
+        """Return the stacked (num_envs, W, H) board tensor. The tensor is live device state."""
+        return self._boards
+
+    @property
+    def dones(self) -> torch.Tensor:
+        """Return the per-env done mask."""
+        return self._done
+
+    @property
+    def winners(self) -> torch.Tensor:
+        """Return the per-env winner cell tags: 1 BLACK, -1 WHITE, 0 for drawn or running games."""
+        return self._winners
+
+    def reset(self) -> torch.Tensor:
+        """Reset every env in the batch and return the board tensor."""
+        self._boards.zero_()
+        self._current_player.fill_(1)
+        self._done.fill_(False)
+        self._winners.zero_()
+        return self._boards
+
+    def sample_valid_actions(self, generator: torch.Generator | None = None) -> torch.Tensor:
+        """Sample one uniformly random empty cell per env in a single device-side draw."""
+        empty = (self._boards.view(self.num_envs, -1) == 0).float()
+        # done envs have no empty-cell guarantee; give them a dummy weight, step ignores them
+        empty[self._done] = 1.0
+        return torch.multinomial(empty, 1, generator=generator).squeeze(1)
+
+    def step(self, actions: torch.Tensor) -> torch.Tensor:
+        """
+        Play one action in every live env and return the done mask.
+
+        Actions of finished envs are ignored; every other action must target an empty cell. The
+        whole update is device-side tensor ops — no per-env Python loop and no host transfer.
+        """
+        flat = self._boards.view(self.num_envs, -1)
+        actions = actions.view(-1, 1)
+        live = ~self._done
+        # finished envs rewrite their current cell value, making their scatter a no-op
+        src = torch.where(live, self._current_player, flat.gather(1, actions).squeeze(1))
+        flat.scatter_(1, actions, src.view(-1, 1))
+
+        stones = (self._boards == self._current_player.view(-1, 1, 1)).float().unsqueeze(1)
+        won = torch.zeros_like(self._done)
+        for kernel in self._win_kernels:
+            won |= (F.conv2d(stones, kernel) >= 5.0).flatten(1).any(1)
+        won &= live
+        self._winners = torch.where(won, self._current_player, self._winners)
+        self._done |= won | ((flat != 0).all(1) & live)
+        self._current_player = torch.where(self._done, self._current_player, -self._current_player)
+        return self._done
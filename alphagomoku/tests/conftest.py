@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+from evaluators.heuristic_evaluator import HeuristicEvaluator
+from game.gomoku_utils import GomokuBoard, PlayerEnum
+from rl_env.numba_rollout import play_random_game
+from rl_env.vec_env import GomokuVecEnv
+
+
+@pytest.fixture(scope="session", autouse=True)
+def warm_numba_kernels():
+    """
+    Trigger compilation of the jitted kernels once per session.
+
+    The kernels are disk-cached, but a cold cache would otherwise charge the full compile to
+    whichever test happens to hit each kernel first, skewing timings and slowing -k runs.
+    """
+    play_random_game(np.zeros((15, 15), dtype=np.int8), 1, 1)
+    env = GomokuVecEnv(num_envs=1)
+    env.step(env.sample_valid_actions(np.random.default_rng(0)))
+    HeuristicEvaluator().evaluate_board(GomokuBoard(), PlayerEnum.BLACK, end_game=False)
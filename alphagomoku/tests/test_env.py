@@ -1,7 +1,9 @@
+import numpy as np
 import pytest
 from evaluators.base_evaluator import DummyEvaluator
 from game.gomoku_utils import PlayerEnum
 from rl_env.env import GomokuEnv
+from rl_env.vec_env import GomokuVecEnv
 
 
 def test_env_initialise():
@@ -51,6 +53,25 @@ def test_env_invalid_action():
     env.step(1)
 
 
+def test_env_snapshot_restore():
+    env = GomokuEnv(board_evaluator=DummyEvaluator())
+    env.reset()
+    env.step(0)
+    snapshot = env.snapshot()
+    env.step(1)
+    env.step(2)
+
+    env.restore(snapshot)
+    assert env._steps == 1, "Restore should rewind the step counter"
+    assert len(env.game.game_data.moves) == 1, "Moves made after the snapshot should be unwound"
+    assert env.game.current_player == PlayerEnum.WHITE, "Player to move should be restored"
+    board = env.game.board.to_numpy()
+    assert board[0, 0] == 1, "Moves made before the snapshot should be kept"
+    assert board[0, 1] == 0, "Moves made after the snapshot should be cleared"
+    # the positions freed by the restore can be played again
+    env.step(1)
+
+
 def test_env_game_done():
     env = GomokuEnv(board_evaluator=DummyEvaluator())
     env.reset()
@@ -70,3 +91,32 @@ def test_env_game_done():
     assert env._is_reset is True, "Environment should be reset"
     assert env._steps == 0, "No steps should have been taken"
     assert env.game.current_player == PlayerEnum.BLACK, "Player should be black"
+
+
+def test_vec_env_scripted_win():
+    env = GomokuVecEnv(num_envs=2)
+    env.reset()
+    # env 0 replays the five-in-a-row script from test_env_game_done; env 1 plays the same game
+    # shifted by a row but puts its fifth black stone elsewhere, so it stays unfinished
+    for i in range(9):
+        action = i // 2 if i % 2 == 0 else i + 100
+        other = 200 if i == 8 else action + 15
+        done = env.step(np.array([action, other], dtype=np.int32))
+    assert done[0], "Env 0 should be done after black's fifth stone"
+    assert env.winners[0] == 1, "Black should have won env 0"
+    assert not done[1], "Env 1 should still be running"
+    assert env.winners[1] == 0, "Env 1 should have no winner"
+
+
+def test_vec_env_random_playout():
+    rng = np.random.default_rng(0)
+    env = GomokuVecEnv(num_envs=4)
+    env.reset()
+    for _ in range(env._n_cells):
+        if env.step(env.sample_valid_actions(rng)).all():
+            break
+    assert env.dones.all(), "Every game should finish within one board's worth of moves"
+    for board, winner in zip(env.boards, env.winners):
+        n_black, n_white = (board == 1).sum(), (board == -1).sum()
+        assert n_black - n_white in (0, 1), "Stone counts should alternate"
+        assert winner in (-1, 0, 1)
@@ -48,6 +48,25 @@ def test_evaluate_move():
     assert len(empty_game.game_data.moves) == 0, "The game should not be modified"
 
 
+def test_heuristic_incremental_evaluation():
+    """Test that the incremental re-evaluation matches a full evaluation from scratch."""
+    game = dummy_game()
+    evaluator = HeuristicEvaluator()
+    evaluator.evaluate_board(game.board, from_player=game.current_player, end_game=False)
+
+    # a second evaluation of the changed board takes the incremental path
+    game.make_move(Move(PlayerEnum.WHITE, GridPosition(7, 7)))
+    score = evaluator.evaluate_board(game.board, from_player=game.current_player, end_game=False)
+    fresh_score = HeuristicEvaluator().evaluate_board(game.board, from_player=game.current_player, end_game=False)
+    assert score == fresh_score, "Incremental evaluation should match a full evaluation"
+
+    # unmaking the move is also a single-cell change
+    game.unmake_move()
+    score = evaluator.evaluate_board(game.board, from_player=game.current_player, end_game=False)
+    fresh_score = HeuristicEvaluator().evaluate_board(game.board, from_player=game.current_player, end_game=False)
+    assert score == fresh_score, "Incremental evaluation should match after unmaking a move"
+
+
 def test_heuristic_evaluate_board():
     """Test the evaluate_board method."""
     game = dummy_game()
@@ -25,10 +25,11 @@ def test_make_move_updates_game_data():
     assert game.current_player == PlayerEnum.WHITE
 
 
-def test_can_store_gamedata_and_clone_boards():
+def test_can_store_gamedata_and_clone_boards(tmp_path):
     game, _ = get_test_game()
-    game.store_game_data("test.json")
-    game2 = GomokuGame.replay_game("test.json")
+    game_file = str(tmp_path / "test.json")
+    game.store_game_data(game_file)
+    game2 = GomokuGame.replay_game(game_file)
     assert game2.game_data.moves == game.game_data.moves
     assert game2.game_data.winner == game.game_data.winner
     assert game2.current_player == game.current_player
@@ -1,6 +1,7 @@
 import numpy as np
 import pytest
-from game.gomoku_utils import GomokuBoard, GomokuCell, GridPosition, Move, PlayerEnum
+from game.board_batch import BoardBatch
+from game.gomoku_utils import GomokuBoard, GridPosition, Move, PlayerEnum
 
 
 def test_grid_position():
@@ -10,31 +11,23 @@ def test_grid_position():
     assert position() == (5, 5)
 
 
-def test_initialise_cell():
-    cell = GomokuCell()
-    # Originally the cell should be empty (no player)
-    assert cell.get_player() is None, "Cell should be empty"
-    # Set the player to black and check if it is black
-    cell.set_player(PlayerEnum.BLACK)
-    assert cell.get_player() == PlayerEnum.BLACK, "Cell should be black"
-    # Try to set the player to white, which should raise an error
-    with pytest.raises(AssertionError):
-        cell.set_player(PlayerEnum.WHITE)
-
-
 def test_initialise_board_and_make_move():
     board = GomokuBoard()
     # Default size is 15 by 15
     assert board.size == (15, 15)
 
     empty_position = GridPosition(5, 5)
-    assert board[empty_position].get_player() is None, "Cell should be empty"
+    assert board[empty_position] == 0, "Cell should be empty"
 
     # Introduce a move and check cell
     move = Move(PlayerEnum.BLACK, GridPosition(1, 1))
     board.make_move(move)
-    assert board[move.position].get_player() == PlayerEnum.BLACK, "Cell should be black"
-    assert board[empty_position].get_player() is None, "Cell should be empty"
+    assert board[move.position] == 1, "Cell should be black"
+    assert board[empty_position] == 0, "Cell should be empty"
+
+    # Playing an occupied cell should raise an error
+    with pytest.raises(AssertionError):
+        board.make_move(Move(PlayerEnum.WHITE, GridPosition(1, 1)))
 
     # Make an invalid move
     with pytest.raises(AssertionError):
@@ -62,3 +55,31 @@ def test_available_positions():
     assert position_mask[5 * nx + 5] == -1, "Position should be masked"
     position_mask = np.delete(position_mask, 5 * nx + 5)
     assert position_mask.all(), "All other positions should be available"
+
+    # Test the incrementally maintained action array
+    actions = board.get_available_actions()
+    assert len(actions) == nx * ny - 1, "One action should have been removed"
+    assert 5 * nx + 5 not in actions, "The played action should not be available"
+    board.undo_move(dummy_move)
+    actions = board.get_available_actions()
+    assert len(actions) == nx * ny, "The undone action should be available again"
+    assert 5 * nx + 5 in actions, "The undone action should be restored"
+
+
+def test_board_batch_collect():
+    board = GomokuBoard()
+    batch = BoardBatch(capacity=2)
+    assert len(batch) == 0 and not batch.is_full
+
+    ix = batch.collect(board)
+    board.make_move(Move(PlayerEnum.BLACK, GridPosition(1, 1)))
+    batch.collect(board)
+    assert batch.is_full
+    # the first snapshot was taken before the move and must not see it
+    assert batch.buf[ix, 1, 1] == 0, "Snapshots should be copies, not views"
+    assert batch.buf[1, 1, 1] == 1, "The second snapshot should contain the move"
+
+    with pytest.raises(AssertionError):
+        batch.collect(board)
+    batch.clear()
+    assert len(batch) == 0, "clear should empty the batch for reuse"
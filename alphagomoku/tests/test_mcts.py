@@ -0,0 +1,73 @@
+import concurrent.futures as cf
+
+import numpy as np
+import pytest
+
+# the MCTS module imports torch at module scope; skip cleanly in environments without it
+torch = pytest.importorskip("torch")
+
+from algos.mcts.mcts import MCTS, BatchedPolicyEvaluator, MCTSConfig    # noqa: E402
+from evaluators.base_evaluator import DummyEvaluator    # noqa: E402
+from rl_env.env import GomokuEnv    # noqa: E402
+
+
+class _FakePolicyNetwork(torch.nn.Module):
+    """Uniform-logit stand-in for the policy network, counting single and batched calls."""
+    def __init__(self):
+        super().__init__()
+        self.n_predict = 0
+        self.n_predict_batch = 0
+
+    def predict(self, board: np.ndarray, hidden_state) -> tuple[np.ndarray, None]:
+        self.n_predict += 1
+        return np.zeros(int((board == 0).sum()), dtype=np.float32), None
+
+    def predict_batch(self, boards: np.ndarray, hidden_states) -> list[tuple[np.ndarray, None]]:
+        self.n_predict_batch += 1
+        return [(np.zeros(int((board == 0).sum()), dtype=np.float32), None) for board in boards]
+
+
+def _env_with_opening() -> GomokuEnv:
+    """An env a couple of moves into a game, so the root fan-out is smaller than the board."""
+    env = GomokuEnv(board_evaluator=DummyEvaluator())
+    env.reset()
+    env.step(0)
+    env.step(16)
+    return env
+
+
+def test_mcts_policy_network_serial():
+    env = _env_with_opening()
+    network = _FakePolicyNetwork()
+    mcts = MCTS(policy_network=network, mcts_config=MCTSConfig(num_simulations=8))
+    move = mcts.run(env)
+
+    assert move.player == env.game.current_player, "The move should be for the side to play"
+    assert mcts.root_node is not None and mcts.root_node.is_expanded, "The root should have been expanded"
+    assert network.n_predict > 0, "Leaf evaluations should consult the network"
+
+
+def test_mcts_policy_network_tree_parallel_batched():
+    env = _env_with_opening()
+    config = MCTSConfig(num_simulations=8, max_workers=2, tree_parallelism=True, eval_batch_size=4)
+    network = _FakePolicyNetwork()
+    mcts = MCTS(policy_network=network, mcts_config=config)
+    move = mcts.run(env)
+
+    nx, ny = env.game.board.size
+    assert 0 <= move.position.x < nx and 0 <= move.position.y < ny
+    assert network.n_predict_batch > 0, "Leaf evaluations should go through the batched path"
+
+
+def test_batched_evaluator_propagates_network_errors():
+    class _BrokenNetwork(torch.nn.Module):
+        def predict(self, board, hidden_state):
+            raise RuntimeError("forward pass exploded")
+
+    evaluator = BatchedPolicyEvaluator(_BrokenNetwork(), batch_size=2)
+    future: cf.Future = cf.Future()
+    evaluator._queue.put((np.zeros((15, 15), dtype=np.int8), None, future))
+    # the serve thread must fail the future rather than die and leave it pending forever
+    with pytest.raises(RuntimeError, match="forward pass exploded"):
+        future.result(timeout=5)
+    evaluator.close()
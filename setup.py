@@ -6,19 +6,26 @@ setup(
     packages=find_packages(where="alphagomoku"),
     package_data={"alphagomoku": ["py.typed"]},
     package_dir={"": "alphagomoku"},
+    # core runtime only: the engine, search and env; everything else is opt-in so self-play
+    # workers install and start with the minimum footprint
     install_requires=[
-        "debugpy",
         "gymnasium",
-        "matplotlib",
+        "numba",
         "numpy",
-        "pandas",
-        "PyQt5",
-        "seaborn",
         "torch",
-        "torchvision",
-        "torchaudio",
         "pytorch-lightning",
-        "pytest",
-        "wandb",
     ],
+    extras_require={
+        "train": [
+            "matplotlib",
+            "pandas",
+            "seaborn",
+            "wandb",
+        ],
+        "gui": ["PyQt5"],
+        "dev": [
+            "debugpy",
+            "pytest",
+        ],
+    },
 )